@@ -0,0 +1,97 @@
+"""
+Batch Renderer Module
+Renders quote images across CPU cores with a process pool
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+from image_creator import create_quote_image, preload_backgrounds, preload_fonts
+
+# Default number of render processes per web worker: the host's cores are
+# shared between the WEB_CONCURRENCY web workers (set by gunicorn.conf.py)
+DEFAULT_RENDER_WORKERS = max(1, (os.cpu_count() or 1) // max(int(os.environ.get("WEB_CONCURRENCY", 1)), 1))
+
+# Render processes are started from a clean server process rather than
+# forked from a web worker, whose other threads may hold locks (metrics,
+# background and font caches) at the moment of the fork
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def warm_render_worker() -> None:
+    """Process pool initializer: load backgrounds and fonts once per worker"""
+    preload_backgrounds()
+    preload_fonts()
+
+
+def render_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render one image in a worker process
+
+    Args:
+        job: Keyword arguments for create_quote_image (output_path is ignored)
+
+    Returns:
+        Dict with the encoded image bytes and encoding stats
+    """
+    job = dict(job, output_path=None)
+    encoded = create_quote_image(**job)
+    return {
+        "data": encoded.buffer.getvalue(),
+        "mimetype": encoded.mimetype,
+        "extension": encoded.extension,
+        "encode_time": encoded.encode_time,
+    }
+
+
+def get_render_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Get the shared render process pool, starting it on first use"""
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=max_workers or DEFAULT_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context(START_METHOD),
+                    initializer=warm_render_worker,
+                )
+
+    return _pool
+
+
+def render_batch(jobs: List[Dict[str, Any]], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Render a list of jobs in parallel, preserving their order
+
+    Returns:
+        One render_job result per job
+    """
+    return list(iter_render_batch(jobs, max_workers))
+
+
+def iter_render_batch(jobs: List[Dict[str, Any]], max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Render a list of jobs in parallel, yielding each result in order as soon as it is ready
+
+    Every job is submitted up front; closing the iterator early cancels
+    the jobs that have not started.
+    """
+    if not jobs:
+        return iter(())
+
+    return get_render_pool(max_workers).map(render_job, jobs)
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render process pool"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
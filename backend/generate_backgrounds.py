@@ -2,9 +2,8 @@
 Background Generator
 Creates sample background images for AutoQuoter
 """
-from PIL import Image, ImageDraw
 import os
-import math
+from gradients import make_gradient
 
 # Ensure the backgrounds directory exists
 backgrounds_dir = os.path.join(os.path.dirname(__file__), '..', 'assets', 'backgrounds')
@@ -12,36 +11,7 @@ os.makedirs(backgrounds_dir, exist_ok=True)
 
 # Create a variety of gradient backgrounds
 def create_gradient(filename, dimensions, color1, color2, gradient_type='linear'):
-    width, height = dimensions
-    img = Image.new('RGB', (width, height), color1)
-    draw = ImageDraw.Draw(img)
-    
-    if gradient_type == 'linear':
-        # Linear gradient from top to bottom
-        for y in range(height):
-            r = int(color1[0] + (color2[0] - color1[0]) * y / height)
-            g = int(color1[1] + (color2[1] - color1[1]) * y / height)
-            b = int(color1[2] + (color2[2] - color1[2]) * y / height)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-    
-    elif gradient_type == 'radial':
-        # Radial gradient from center
-        center_x, center_y = width // 2, height // 2
-        max_dist = math.sqrt(center_x**2 + center_y**2)
-        
-        # For radial gradients, use a more efficient approach
-        # by drawing rectangles of decreasing size
-        for radius in range(int(max_dist), 0, -1):
-            ratio = radius / max_dist
-            r = int(color1[0] + (color2[0] - color1[0]) * ratio)
-            g = int(color1[1] + (color2[1] - color1[1]) * ratio)
-            b = int(color1[2] + (color2[2] - color1[2]) * ratio)
-            
-            # Draw a filled ellipse with this color
-            bbox = (center_x - radius, center_y - radius, 
-                   center_x + radius, center_y + radius)
-            draw.ellipse(bbox, fill=(r, g, b))
-    
+    img = make_gradient(dimensions, [color1, color2], gradient_type)
     img.save(os.path.join(backgrounds_dir, filename))
     print(f"Created {filename}")
 
@@ -0,0 +1,120 @@
+"""
+Gradient Module
+Builds linear and radial multi-stop gradients as whole images
+"""
+import math
+from typing import List, Sequence, Tuple, Union
+from PIL import Image
+
+Color = Tuple[int, int, int]
+ColorStop = Tuple[float, Color]
+
+# Pillow's built-in gradients are 256x256 'L' images
+_GRADIENT_SIZE = 256
+
+
+def normalize_stops(stops: Sequence[Union[Color, ColorStop]]) -> List[ColorStop]:
+    """
+    Turn a list of colors or (position, color) pairs into sorted color stops
+
+    Plain colors are spread evenly from 0.0 to 1.0.
+    """
+    if len(stops) < 2:
+        raise ValueError("A gradient needs at least two colors")
+
+    if all(len(stop) == 2 for stop in stops):
+        return sorted((float(position), tuple(color)) for position, color in stops)
+
+    last = len(stops) - 1
+    return [(index / last, tuple(color)) for index, color in enumerate(stops)]
+
+
+def build_color_lut(stops: Sequence[Union[Color, ColorStop]]) -> List[int]:
+    """
+    Build a 768-entry lookup table (R, G, B) mapping 0-255 to gradient colors
+
+    Suitable for Image.point on an RGB image whose channels all hold the
+    same gradient position.
+    """
+    stops = normalize_stops(stops)
+    channels = ([], [], [])
+
+    for value in range(256):
+        t = value / 255
+        if t <= stops[0][0]:
+            color = stops[0][1]
+        elif t >= stops[-1][0]:
+            color = stops[-1][1]
+        else:
+            for (start, start_color), (end, end_color) in zip(stops, stops[1:]):
+                if start <= t <= end:
+                    ratio = (t - start) / (end - start) if end > start else 0
+                    color = tuple(
+                        int(a + (b - a) * ratio)
+                        for a, b in zip(start_color, end_color)
+                    )
+                    break
+
+        for channel, component in zip(channels, color):
+            channel.append(component)
+
+    return channels[0] + channels[1] + channels[2]
+
+
+def gradient_mask(size: Tuple[int, int], kind: str = "linear") -> Image.Image:
+    """
+    Build an 'L' image holding the gradient position (0-255) of each pixel
+
+    Linear gradients run from top (0) to bottom (255). Radial gradients run
+    from the center (0) to the corners (255), with circular contours.
+    """
+    width, height = size
+
+    if kind == "linear":
+        # One column is enough; widening it with NEAREST just repeats it
+        column = bytes(255 * y // max(height - 1, 1) for y in range(height))
+        return Image.frombytes("L", (1, height), column).resize(size, Image.NEAREST)
+
+    if kind == "radial":
+        # radial_gradient reaches 255 at its corners. Sample the centered box
+        # with the target's aspect ratio, then stretch values so that 255
+        # falls on the target's corners rather than the square's.
+        longest = max(width, height)
+        half_width = _GRADIENT_SIZE / 2 * width / longest
+        half_height = _GRADIENT_SIZE / 2 * height / longest
+        center = _GRADIENT_SIZE / 2
+        box = (center - half_width, center - half_height, center + half_width, center + half_height)
+        mask = Image.radial_gradient("L").resize(size, Image.BILINEAR, box=box)
+
+        scale = (longest / math.sqrt(2)) / (math.hypot(width, height) / 2)
+        if scale != 1:
+            mask = mask.point([min(255, round(value * scale)) for value in range(256)])
+        return mask
+
+    raise ValueError(f"Unknown gradient type: {kind}")
+
+
+def make_gradient(
+    size: Tuple[int, int],
+    stops: Sequence[Union[Color, ColorStop]],
+    kind: str = "linear"
+) -> Image.Image:
+    """
+    Create an RGB gradient image
+
+    Args:
+        size: (width, height) of the image
+        stops: Colors, or (position, color) pairs with positions in 0.0-1.0
+        kind: "linear" (top to bottom) or "radial" (center to corners)
+
+    Returns:
+        RGB image of the requested size
+    """
+    lut = build_color_lut(stops)
+
+    if kind == "linear":
+        # Color a single column, then repeat it across the width
+        column = gradient_mask((1, size[1]), kind).convert("RGB").point(lut)
+        return column.resize(size, Image.NEAREST)
+
+    return gradient_mask(size, kind).convert("RGB").point(lut)
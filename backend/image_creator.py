@@ -2,10 +2,18 @@
 Image Creator Module
 Generates quote images using PIL
 """
+import functools
+import io
 import os
 import random
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-from typing import Tuple, Optional
+import threading
+import time
+from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageOps
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple, Optional, Union
+from gradients import make_gradient
+from metrics import metrics
+from storage import write_atomic
+from text_layout import fit_text, layout_text, wrap_words
 
 # Constants
 ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets')
@@ -16,6 +24,27 @@ FONTS_DIR = os.path.join(ASSETS_DIR, 'fonts')
 IMAGE_WIDTH = 1080
 IMAGE_HEIGHT = 1080
 
+# Quote font size, fixed or chosen by auto-fit within a range
+QUOTE_FONT_SIZE = 60
+AUTO_FIT_MIN_FONT_SIZE = 32
+AUTO_FIT_MAX_FONT_SIZE = 96
+
+# Space kept free around the quote: sides, top and bottom, plus the author line below it
+QUOTE_MARGIN = 100
+AUTHOR_SPACE = 120
+
+# Longest quote accepted for rendering
+MAX_QUOTE_LENGTH = 500
+
+# Named output sizes (width, height) for the places quotes get posted
+OUTPUT_SIZES = {
+    "square": (1080, 1080),
+    "portrait": (1080, 1350),
+    "story": (1080, 1920),
+}
+MIN_IMAGE_DIMENSION = 400
+MAX_IMAGE_DIMENSION = 4096
+
 # Theme to background mapping (will fallback to random if theme not found)
 THEME_BACKGROUNDS = {
     "motivation": ["mountain.jpg", "sunrise.jpg", "ocean.jpg"],
@@ -25,6 +54,81 @@ THEME_BACKGROUNDS = {
     "happiness": ["beach.jpg", "sunset.jpg", "flowers.jpg"],
 }
 
+# Top and bottom colors of the fallback gradient background
+DEFAULT_BACKGROUND_COLORS = [(30, 30, 70), (70, 50, 100)]
+
+# Pre-processing applied to every background before text is drawn
+BACKGROUND_BLUR_RADIUS = 2      # At a shorter side of BLUR_REFERENCE_SIZE pixels
+BLUR_REFERENCE_SIZE = 1080      # Other sizes scale the radius with their shorter side
+BACKGROUND_DARKEN_FACTOR = 0.6  # Darken by 40%
+
+# Process-wide cache of pre-processed backgrounds, for the named output
+# sizes only (see get_processed_background)
+# {(file_name, (width, height)): (mtime, processed_image)}
+_BACKGROUND_CACHE = {}
+_CACHED_BACKGROUND_SIZES = frozenset([(IMAGE_WIDTH, IMAGE_HEIGHT), *OUTPUT_SIZES.values()])
+_BACKGROUND_LOCK = threading.Lock()
+
+# Text effects used to keep text readable on any background:
+#   "stroke" - 1px outline rendered by FreeType in the same pass as the fill
+#   "shadow" - one soft drop shadow mask, blurred and composited once
+#   "offset" - legacy outline made of four 1px offset draws
+TEXT_EFFECTS = ("stroke", "shadow", "offset")
+DEFAULT_TEXT_EFFECT = "stroke"
+THEME_TEXT_EFFECTS = {
+    "motivation": "stroke",
+    "stoicism": "shadow",
+    "success": "stroke",
+    "leadership": "stroke",
+    "happiness": "shadow",
+}
+
+TEXT_FILL = (255, 255, 255)
+WATERMARK_FILL = (255, 255, 255)
+SHADOW_FILL = (0, 0, 0)
+SHADOW_OFFSET = (2, 2)
+SHADOW_BLUR_RADIUS = 3
+SHADOW_OPACITY = 180
+
+# Watermark text, drawn on a static overlay cached per (theme, size)
+WATERMARK_TEXT = "AutoQuoter.com"
+OVERLAY_CACHE_SIZE = 32
+
+# Rasterized author lines kept for reuse (authors repeat far more than quotes)
+GLYPH_RUN_CACHE_SIZE = 512
+
+# Output encoders and their default settings
+OUTPUT_FORMATS = {
+    "png": {
+        "pil_format": "PNG",
+        "mimetype": "image/png",
+        "extension": "png",
+        "options": {"compress_level": 6},
+    },
+    "jpeg": {
+        "pil_format": "JPEG",
+        "mimetype": "image/jpeg",
+        "extension": "jpg",
+        "options": {"quality": 85, "progressive": True, "optimize": True},
+    },
+    "webp": {
+        "pil_format": "WEBP",
+        "mimetype": "image/webp",
+        "extension": "webp",
+        "options": {"quality": 85, "method": 4},
+    },
+}
+DEFAULT_OUTPUT_FORMAT = "png"
+
+# Server-side output format default per theme
+THEME_OUTPUT_FORMATS = {
+    "motivation": "png",
+    "stoicism": "png",
+    "success": "png",
+    "leadership": "png",
+    "happiness": "png",
+}
+
 # Default fonts to use
 FONTS = {
     "primary": "opensans.ttf",
@@ -32,119 +136,402 @@ FONTS = {
     "accent": "handwritten.ttf",
 }
 
+# Per-worker registry of loaded fonts
+# {(font_key, size): FreeTypeFont}
+_FONT_CACHE = {}
+_FONT_LOCK = threading.Lock()
+
+
+class EncodedImage(NamedTuple):
+    """An image encoded in memory, with its encoding cost"""
+    buffer: io.BytesIO
+    output_format: str
+    mimetype: str
+    extension: str
+    encode_time: float  # Seconds spent encoding
+
+
+class QuoteLayout(NamedTuple):
+    """Positioned text for one image size"""
+    text_runs: list       # ((x, y), text, font) for the quote lines
+    author_run: tuple     # ((x, y), text, font) for the author attribution
+    add_watermark: bool   # Whether the static watermark overlay is composited
+
+
+class GlyphMask(NamedTuple):
+    """Rasterized text: an 'L' coverage mask and its offset from the draw position"""
+    offset: Tuple[int, int]
+    mask: Image.Image
+
 
 def create_quote_image(
     quote_text: str,
     author: str,
     theme: str = "motivation",
     output_path: str = None,
-    add_watermark: bool = True
-) -> str:
+    add_watermark: bool = True,
+    background_path: Optional[str] = None,
+    output_format: Optional[str] = None,
+    encode_options: Optional[Dict[str, Any]] = None,
+    sizes: Optional[Sequence[Tuple[int, int]]] = None,
+    auto_fit: bool = False
+) -> Union[str, EncodedImage, List[str], List[EncodedImage]]:
     """
     Create a quote image with the given text and author
     
+    When sizes are given, one variant is rendered per size. The fonts,
+    the background choice and the word measurements are shared by all
+    variants; only background preparation (cached per size) and drawing
+    are done per size.
+    
     Args:
         quote_text: The quote text to render
         author: The author of the quote
         theme: Theme for background selection
-        output_path: Where to save the image
+        output_path: Where to save the image (None to encode in memory)
         add_watermark: Whether to add AutoQuoter watermark
+        background_path: Background to use (picked from the theme if not given)
+        output_format: One of OUTPUT_FORMATS (theme default if not given)
+        encode_options: Encoder settings overriding the format defaults
+        sizes: (width, height) of each variant to render (None for a single
+            IMAGE_WIDTH x IMAGE_HEIGHT image)
+        auto_fit: Pick the largest quote font size that fits each image
+            instead of QUOTE_FONT_SIZE
         
     Returns:
-        Path to the generated image
+        Path to the generated image, or an EncodedImage when output_path is None.
+        With sizes, a list of those in the same order; saved variants get a
+        "_<width>x<height>" suffix on output_path.
     """
-    # Make sure directories exist
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
     # Get a background image based on theme
-    background_path = get_background_for_theme(theme)
+    if background_path is None:
+        background_path = get_background_for_theme(theme)
+    
+    if output_format is None:
+        output_format = get_output_format_for_theme(theme)
+    
+    if sizes is None:
+        img = render_quote(quote_text, author, theme, (IMAGE_WIDTH, IMAGE_HEIGHT), add_watermark, background_path, auto_fit)
+        return save_quote_image(img, output_path, output_format, encode_options)
+    
+    results = []
+    for width, height in sizes:
+        img = render_quote(quote_text, author, theme, (width, height), add_watermark, background_path, auto_fit)
+        variant_path = None
+        if output_path is not None:
+            root, extension = os.path.splitext(output_path)
+            variant_path = f"{root}_{width}x{height}{extension}"
+        results.append(save_quote_image(img, variant_path, output_format, encode_options))
+    
+    return results
+
+
+def render_quote(
+    quote_text: str,
+    author: str,
+    theme: str,
+    size: Tuple[int, int],
+    add_watermark: bool,
+    background_path: Optional[str],
+    auto_fit: bool = False
+) -> Image.Image:
+    """
+    Draw a quote onto its processed background at the given size
     
-    # Create base image
-    img = Image.open(background_path) if background_path else create_default_background()
+    Returns:
+        The rendered RGB image
+    """
+    # Create base image (resized, blurred and darkened, served from cache)
+    with metrics.timer("background"):
+        img = get_processed_background(background_path, size)
     
-    # Resize to standard dimensions
-    img = img.resize((IMAGE_WIDTH, IMAGE_HEIGHT))
+    # Lay out the text once; the draw calls do no measuring
+    with metrics.timer("layout"):
+        layout = layout_quote(quote_text, author, size, add_watermark, auto_fit)
+    with metrics.timer("draw"):
+        draw_quote(img, layout, theme)
     
-    # Apply slight blur and darken for better text visibility
-    img = img.filter(ImageFilter.GaussianBlur(radius=2))
-    img = darken_image(img, factor=0.6)  # Darken by 40%
+    return img
+
+
+def layout_quote(
+    quote_text: str,
+    author: str,
+    size: Tuple[int, int],
+    add_watermark: bool = True,
+    auto_fit: bool = False
+) -> QuoteLayout:
+    """
+    Position the quote and author text for an image size
     
-    # Create a drawing context
-    draw = ImageDraw.Draw(img)
+    With auto_fit, the quote font size is binary-searched between
+    AUTO_FIT_MIN_FONT_SIZE and AUTO_FIT_MAX_FONT_SIZE to fill the space
+    left by the margins and the author line.
+    """
+    width, height = size
+    max_width = width - 2 * QUOTE_MARGIN
     
     # Load fonts
-    quote_font = get_font("primary", size=60)
     author_font = get_font("secondary", size=40)
-    watermark_font = get_font("primary", size=24)
     
-    # Calculate text dimensions and positions
-    quote_lines = text_wrap(quote_text, quote_font, IMAGE_WIDTH - 200)
-    quote_text_height = sum(draw.textbbox((0, 0), line, font=quote_font)[3] for line in quote_lines)
+    if auto_fit:
+        quote_font, quote_block = fit_text(
+            quote_text,
+            lambda font_size: get_font("primary", size=font_size),
+            AUTO_FIT_MIN_FONT_SIZE,
+            AUTO_FIT_MAX_FONT_SIZE,
+            max_width,
+            height - 2 * QUOTE_MARGIN - AUTHOR_SPACE,
+            width,
+        )
+    else:
+        quote_font = get_font("primary", size=QUOTE_FONT_SIZE)
+        quote_block = layout_text(quote_text, quote_font, max_width, width)
+    # The attribution stays on one line however long it is, as remote authors are not length-checked
+    author_block = layout_text(f"— {author}", author_font, float("inf"), width)
     
     # Position for the quote (centered)
-    quote_y = (IMAGE_HEIGHT - quote_text_height - 120) // 2  # 120px space for author
+    quote_y = (height - quote_block.height - AUTHOR_SPACE) // 2
+    
+    # Quote lines followed by the author attribution below them
+    text_runs = [
+        ((line.x, quote_y + line.y), line.text, quote_font)
+        for line in quote_block.lines
+    ]
+    author_line = author_block.lines[0]
+    author_y = quote_y + quote_block.height + 50
+    author_run = ((author_line.x, author_y), author_line.text, author_font)
+    
+    return QuoteLayout(text_runs, author_run, add_watermark)
+
+
+def draw_quote(img: Image.Image, layout: QuoteLayout, theme: str) -> None:
+    """Draw laid-out quote text onto an image in place"""
+    # Draw text with shadow for better visibility; the author line is rasterized from cache
+    draw_text_with_effect(
+        img, layout.text_runs, THEME_TEXT_EFFECTS.get(theme.lower(), DEFAULT_TEXT_EFFECT),
+        cached_runs=[layout.author_run]
+    )
+    
+    # Composite the static elements (the watermark) in one paste
+    overlay = get_static_overlay(theme, img.size, layout.add_watermark)
+    if overlay is not None:
+        position, layer = overlay
+        img.paste(layer, position, layer)
+
+
+@functools.lru_cache(maxsize=OVERLAY_CACHE_SIZE)
+def get_static_overlay(theme: str, size: Tuple[int, int], add_watermark: bool) -> Optional[Tuple[Tuple[int, int], Image.Image]]:
+    """
+    Build (once per theme, size and watermark flag) the layer of elements every image shares
     
-    # Draw text with shadow for better visibility
-    for line in quote_lines:
-        bbox = draw.textbbox((0, 0), line, font=quote_font)
-        text_width = bbox[2]
-        text_x = (IMAGE_WIDTH - text_width) // 2
-        
-        # Draw shadow/outline
-        for offset in [(1, 1), (-1, -1), (1, -1), (-1, 1)]:
-            draw.text((text_x + offset[0], quote_y + offset[1]), line, font=quote_font, fill=(0, 0, 0, 180))
-        
-        # Draw the actual text
-        draw.text((text_x, quote_y), line, font=quote_font, fill=(255, 255, 255))
-        quote_y += bbox[3] + 10  # Move down for next line + some spacing
-    
-    # Add author attribution
-    author_text = f"— {author}"
-    author_bbox = draw.textbbox((0, 0), author_text, font=author_font)
-    author_width = author_bbox[2]
-    author_x = (IMAGE_WIDTH - author_width) // 2
-    author_y = quote_y + 40  # Below the quote text
-    
-    # Draw author with shadow
-    for offset in [(1, 1), (-1, -1), (1, -1), (-1, 1)]:
-        draw.text((author_x + offset[0], author_y + offset[1]), author_text, font=author_font, fill=(0, 0, 0, 180))
-    
-    # Draw the actual author text
-    draw.text((author_x, author_y), author_text, font=author_font, fill=(255, 255, 255))
-    
-    # Add watermark if needed
-    if add_watermark:
-        watermark_text = "AutoQuoter.com"
-        watermark_bbox = draw.textbbox((0, 0), watermark_text, font=watermark_font)
-        watermark_width = watermark_bbox[2]
-        watermark_x = (IMAGE_WIDTH - watermark_width) // 2
-        watermark_y = IMAGE_HEIGHT - 60  # Near the bottom
-        
-        # Draw watermark with semi-transparency
-        draw.text((watermark_x, watermark_y), watermark_text, font=watermark_font, fill=(255, 255, 255, 180))
+    Returns:
+        (position, RGBA layer cropped to its content), or None if there is nothing to draw
+    """
+    if not add_watermark:
+        return None
     
-    # Save the image
-    img.save(output_path, "PNG")
+    width, height = size
+    watermark_font = get_font("primary", size=24)
+    watermark_line = layout_text(WATERMARK_TEXT, watermark_font, width, width).lines[0]
+    watermark_y = height - 60  # Near the bottom
+    
+    glyphs = rasterize_text(watermark_line.text, watermark_font)
+    layer = Image.new('RGBA', glyphs.mask.size, WATERMARK_FILL + (0,))
+    layer.putalpha(glyphs.mask)
+    return (watermark_line.x + glyphs.offset[0], watermark_y + glyphs.offset[1]), layer
+
+
+def save_quote_image(
+    img: Image.Image,
+    output_path: Optional[str],
+    output_format: str,
+    encode_options: Optional[Dict[str, Any]] = None
+) -> Union[str, EncodedImage]:
+    """Encode a rendered image in memory (output_path None) or save it to disk"""
+    if output_path is None:
+        encoded = encode_image(img, output_format, encode_options)
+        metrics.record_stage("encode", encoded.encode_time)
+        return encoded
+    
+    # Save the image atomically so readers never see a partial file
+    pil_format, save_options = get_save_options(output_format, encode_options)
+    with metrics.timer("encode"):
+        write_atomic(output_path, lambda f: img.save(f, pil_format, **save_options))
     
     return output_path
 
 
-def get_background_for_theme(theme: str) -> Optional[str]:
-    """Get a background image path based on theme"""
+def parse_size(value: Union[str, Sequence[int]]) -> Tuple[int, int]:
+    """
+    Resolve an output size given as a name from OUTPUT_SIZES, "WIDTHxHEIGHT" or [width, height]
+    
+    Raises:
+        ValueError: If the size is malformed or outside the allowed dimensions
+    """
+    if isinstance(value, str):
+        if value.lower() in OUTPUT_SIZES:
+            return OUTPUT_SIZES[value.lower()]
+        parts = value.lower().split("x")
+    else:
+        parts = list(value)
+    
+    try:
+        width, height = (int(part) for part in parts)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid size: {value!r} (use one of {', '.join(OUTPUT_SIZES)} or WIDTHxHEIGHT)")
+    
+    for dimension in (width, height):
+        if not MIN_IMAGE_DIMENSION <= dimension <= MAX_IMAGE_DIMENSION:
+            raise ValueError(f"Image dimensions must be between {MIN_IMAGE_DIMENSION} and {MAX_IMAGE_DIMENSION} pixels")
+    
+    return width, height
+
+
+def get_output_format_for_theme(theme: str) -> str:
+    """Get the server-side default output format for a theme"""
+    return THEME_OUTPUT_FORMATS.get(theme.lower(), DEFAULT_OUTPUT_FORMAT)
+
+
+def get_save_options(output_format: str, encode_options: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Resolve the Pillow format name and save options for an output format
+    
+    Raises:
+        ValueError: If the output format is not supported
+    """
+    encoder = OUTPUT_FORMATS.get(output_format)
+    if encoder is None:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    
+    save_options = dict(encoder["options"])
+    save_options.update(encode_options or {})
+    return encoder["pil_format"], save_options
+
+
+def encode_image(
+    img: Image.Image,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    encode_options: Optional[Dict[str, Any]] = None
+) -> EncodedImage:
+    """Encode an image in memory, timing the encoder"""
+    pil_format, save_options = get_save_options(output_format, encode_options)
+    encoder = OUTPUT_FORMATS[output_format]
+    
+    buffer = io.BytesIO()
+    start_time = time.perf_counter()
+    img.save(buffer, pil_format, **save_options)
+    encode_time = time.perf_counter() - start_time
+    buffer.seek(0)
+    
+    return EncodedImage(buffer, output_format, encoder["mimetype"], encoder["extension"], encode_time)
+
+
+def draw_text_with_effect(
+    img: Image.Image,
+    text_runs: list,
+    effect: str = DEFAULT_TEXT_EFFECT,
+    cached_runs: Sequence[tuple] = ()
+) -> None:
+    """
+    Draw white text with a readability effect onto an image in place
+    
+    Every run is rasterized into coverage masks once and composited with
+    paste, which blends exactly like ImageDraw.text.
+    
+    Args:
+        img: RGB image to draw on
+        text_runs: List of ((x, y), text, font) tuples
+        effect: One of TEXT_EFFECTS
+        cached_runs: Runs like text_runs, drawn after them, whose masks
+            come from the glyph run cache (for text that repeats)
+    """
+    if effect not in TEXT_EFFECTS:
+        raise ValueError(f"Unknown text effect: {effect}")
+    
+    # Pair each run with how its masks are rasterized
+    runs = [(xy, text, font, rasterize_text) for xy, text, font in text_runs]
+    runs += [(xy, text, font, get_glyph_run) for xy, text, font in cached_runs]
+    
+    if effect == "stroke":
+        # 1px outline under each run, as FreeType strokes it
+        for xy, text, font, rasterize in runs:
+            _paste_glyphs(img, SHADOW_FILL, xy, rasterize(text, font, 1))
+            _paste_glyphs(img, TEXT_FILL, xy, rasterize(text, font))
+        return
+    
+    glyph_runs = [(xy, rasterize(text, font)) for xy, text, font, rasterize in runs]
+    
+    if effect == "shadow":
+        # Rasterize every run into a single mask, then blur and composite once
+        mask = Image.new('L', img.size, 0)
+        for (x, y), glyphs in glyph_runs:
+            _paste_glyphs(mask, SHADOW_OPACITY, (x + SHADOW_OFFSET[0], y + SHADOW_OFFSET[1]), glyphs)
+        
+        # Only blur the region that actually contains text
+        bbox = mask.getbbox()
+        if bbox:
+            pad = SHADOW_BLUR_RADIUS * 3
+            region = (
+                max(bbox[0] - pad, 0), max(bbox[1] - pad, 0),
+                min(bbox[2] + pad, img.width), min(bbox[3] + pad, img.height),
+            )
+            shadow = mask.crop(region).filter(ImageFilter.GaussianBlur(radius=SHADOW_BLUR_RADIUS))
+            img.paste(SHADOW_FILL, region, mask=shadow)
+    else:
+        for (x, y), glyphs in glyph_runs:
+            for offset in [(1, 1), (-1, -1), (1, -1), (-1, 1)]:
+                _paste_glyphs(img, SHADOW_FILL, (x + offset[0], y + offset[1]), glyphs)
+    
+    for xy, glyphs in glyph_runs:
+        _paste_glyphs(img, TEXT_FILL, xy, glyphs)
+
+
+def rasterize_text(text: str, font: ImageFont.FreeTypeFont, stroke_width: int = 0) -> GlyphMask:
+    """Rasterize a single line of text into the coverage mask ImageDraw.text would blend"""
+    left, top, right, bottom = font.getbbox(text, stroke_width=stroke_width)
+    mask = Image.new('L', (max(right - left, 1), max(bottom - top, 1)), 0)
+    ImageDraw.Draw(mask).text(
+        (-left, -top), text, font=font, fill=255, stroke_width=stroke_width, stroke_fill=255
+    )
+    return GlyphMask((left, top), mask)
+
+
+@functools.lru_cache(maxsize=GLYPH_RUN_CACHE_SIZE)
+def get_glyph_run(text: str, font: ImageFont.FreeTypeFont, stroke_width: int = 0) -> GlyphMask:
+    """Rasterize text through an LRU cache; the returned mask must not be modified"""
+    return rasterize_text(text, font, stroke_width)
+
+
+def _paste_glyphs(img: Image.Image, fill, xy: Tuple[int, int], glyphs: GlyphMask) -> None:
+    """Blend a solid fill into an image through a glyph mask drawn at xy"""
+    x, y = xy
+    img.paste(fill, (int(x) + glyphs.offset[0], int(y) + glyphs.offset[1]), glyphs.mask)
+
+
+def get_background_for_theme(theme: str, seed: Optional[str] = None) -> Optional[str]:
+    """
+    Get a background image path based on theme
+    
+    Args:
+        theme: Theme for background selection
+        seed: When given, the same seed always picks the same background
+    """
     theme = theme.lower()
+    chooser = random.Random(seed) if seed is not None else random
     
     # Get the list of background options for this theme
     background_options = THEME_BACKGROUNDS.get(theme, [])
     
     # If no specific backgrounds for theme, use random from all backgrounds
     if not background_options:
-        background_files = os.listdir(BACKGROUNDS_DIR) if os.path.exists(BACKGROUNDS_DIR) else []
+        background_files = sorted(os.listdir(BACKGROUNDS_DIR)) if os.path.exists(BACKGROUNDS_DIR) else []
         if background_files:
-            return os.path.join(BACKGROUNDS_DIR, random.choice(background_files))
+            return os.path.join(BACKGROUNDS_DIR, chooser.choice(background_files))
         return None
     
     # Pick a random background from the theme options
-    chosen_bg = random.choice(background_options)
+    chosen_bg = chooser.choice(background_options)
     bg_path = os.path.join(BACKGROUNDS_DIR, chosen_bg)
     
     # Check if the file exists
@@ -152,30 +539,150 @@ def get_background_for_theme(theme: str) -> Optional[str]:
         return bg_path
     
     # Fallback to any available background
-    background_files = os.listdir(BACKGROUNDS_DIR) if os.path.exists(BACKGROUNDS_DIR) else []
+    background_files = sorted(os.listdir(BACKGROUNDS_DIR)) if os.path.exists(BACKGROUNDS_DIR) else []
     if background_files:
-        return os.path.join(BACKGROUNDS_DIR, random.choice(background_files))
+        return os.path.join(BACKGROUNDS_DIR, chooser.choice(background_files))
     
     return None
 
 
-def create_default_background() -> Image.Image:
+def prepare_background(img: Image.Image, size: Tuple[int, int] = (IMAGE_WIDTH, IMAGE_HEIGHT)) -> Image.Image:
+    """
+    Crop to size, blur and darken a background for better text visibility
+
+    Works in RGB throughout: at most one resize, one blur and one LUT pass,
+    each producing a single new frame.
+    """
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    if img.size != tuple(size):
+        # Scale to cover the target and center-crop, so other aspect ratios are not stretched
+        img = ImageOps.fit(img, size)
+    img = img.filter(ImageFilter.GaussianBlur(radius=get_blur_radius(size)))
+    return img.point(_darken_lut(BACKGROUND_DARKEN_FACTOR))
+
+
+def get_blur_radius(size: Tuple[int, int]) -> float:
+    """Background blur radius for an output size, scaled with its shorter side"""
+    return BACKGROUND_BLUR_RADIUS * min(size) / BLUR_REFERENCE_SIZE
+
+
+def get_processed_background(
+    background_path: Optional[str],
+    size: Tuple[int, int] = (IMAGE_WIDTH, IMAGE_HEIGHT)
+) -> Image.Image:
+    """
+    Get a pre-processed background ready for drawing
+
+    Each background file is decoded and processed once per process and
+    size, and re-processed only when its modification time changes.
+    Callers get their own copy, so they are free to draw on it. Only the
+    default and OUTPUT_SIZES sizes are cached: any WIDTHxHEIGHT can be
+    requested, so other sizes are processed on every call to keep the
+    cache bounded.
+
+    Args:
+        background_path: Path to the background image, or None for the default gradient
+        size: (width, height) of the image to return
+
+    Returns:
+        A fresh RGB image of the requested size
+    """
+    size = tuple(size)
+    if size not in _CACHED_BACKGROUND_SIZES:
+        metrics.inc("autoquoter_cache_requests_total", cache="background", result="uncached")
+        if background_path:
+            with Image.open(background_path) as source:
+                return prepare_background(source, size)
+        return prepare_background(create_default_background(size), size)
+
+    if background_path:
+        key = (os.path.basename(background_path), size)
+        mtime = os.path.getmtime(background_path)
+    else:
+        key, mtime = (None, size), 0
+
+    cached = _BACKGROUND_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        metrics.inc("autoquoter_cache_requests_total", cache="background", result="hit")
+    else:
+        metrics.inc("autoquoter_cache_requests_total", cache="background", result="miss")
+        with _BACKGROUND_LOCK:
+            cached = _BACKGROUND_CACHE.get(key)
+            if cached is None or cached[0] != mtime:
+                if background_path:
+                    with Image.open(background_path) as source:
+                        processed = prepare_background(source, size)
+                else:
+                    processed = prepare_background(create_default_background(size), size)
+                cached = (mtime, processed)
+                _BACKGROUND_CACHE[key] = cached
+
+    return cached[1].copy()
+
+
+def preload_backgrounds(sizes: Sequence[Tuple[int, int]] = ((IMAGE_WIDTH, IMAGE_HEIGHT),)) -> int:
+    """
+    Warm the background cache with every image in BACKGROUNDS_DIR
+
+    Args:
+        sizes: Sizes to prepare each background at
+
+    Returns:
+        Number of backgrounds loaded
+    """
+    if not os.path.exists(BACKGROUNDS_DIR):
+        return 0
+
+    loaded = 0
+    for file_name in sorted(os.listdir(BACKGROUNDS_DIR)):
+        try:
+            for size in sizes:
+                get_processed_background(os.path.join(BACKGROUNDS_DIR, file_name), size)
+            loaded += 1
+        except Exception as e:
+            print(f"Failed to preload background {file_name}: {e}")
+
+    return loaded
+
+
+def create_default_background(size: Tuple[int, int] = (IMAGE_WIDTH, IMAGE_HEIGHT)) -> Image.Image:
     """Create a default gradient background if no image is available"""
-    img = Image.new('RGB', (IMAGE_WIDTH, IMAGE_HEIGHT), color=(30, 30, 30))
-    draw = ImageDraw.Draw(img)
-    
-    # Create a simple gradient
-    for y in range(IMAGE_HEIGHT):
-        r = int(30 + (y / IMAGE_HEIGHT) * 40)
-        g = int(30 + (y / IMAGE_HEIGHT) * 20)
-        b = int(70 + (y / IMAGE_HEIGHT) * 30)
-        draw.line([(0, y), (IMAGE_WIDTH, y)], fill=(r, g, b))
-    
-    return img
+    return _default_gradient(size).copy()
+
+
+@functools.lru_cache(maxsize=8)
+def _default_gradient(size: Tuple[int, int]) -> Image.Image:
+    """Build (once per size) the default background gradient"""
+    return make_gradient(size, DEFAULT_BACKGROUND_COLORS)
 
 
 def get_font(font_key: str, size: int) -> ImageFont.FreeTypeFont:
-    """Get a font with the specified size"""
+    """
+    Get a font with the specified size
+
+    Resolved fonts (including fallbacks) are cached per (font_key, size),
+    so each face is loaded from disk once per worker.
+    """
+    cache_key = (font_key, size)
+    font = _FONT_CACHE.get(cache_key)
+    if font is not None:
+        metrics.inc("autoquoter_cache_requests_total", cache="font", result="hit")
+        return font
+
+    metrics.inc("autoquoter_cache_requests_total", cache="font", result="miss")
+    with _FONT_LOCK:
+        font = _FONT_CACHE.get(cache_key)
+        if font is None:
+            with metrics.timer("font_load"):
+                font = load_font(font_key, size)
+            _FONT_CACHE[cache_key] = font
+
+    return font
+
+
+def load_font(font_key: str, size: int) -> ImageFont.FreeTypeFont:
+    """Load a font from disk, falling back to system and default fonts"""
     font_file = FONTS.get(font_key, "opensans.ttf")
     font_path = os.path.join(FONTS_DIR, font_file)
     
@@ -195,46 +702,38 @@ def get_font(font_key: str, size: int) -> ImageFont.FreeTypeFont:
         return ImageFont.load_default()
 
 
+def preload_fonts(sizes: Tuple[int, ...] = (60, 40, 24)) -> int:
+    """
+    Warm the font cache for every configured font at the given sizes
+
+    Returns:
+        Number of fonts loaded
+    """
+    for font_key in FONTS:
+        for size in sizes:
+            get_font(font_key, size)
+    return len(FONTS) * len(sizes)
+
+
 def text_wrap(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list:
     """Wrap text to fit within max_width"""
-    lines = []
-    words = text.split()
-    current_line = []
-    
-    for word in words:
-        # Try adding this word to the current line
-        test_line = ' '.join(current_line + [word])
-        bbox = ImageDraw.Draw(Image.new('RGB', (1, 1))).textbbox((0, 0), test_line, font=font)
-        text_width = bbox[2]
-        
-        if text_width <= max_width:
-            # Word fits, add it to the current line
-            current_line.append(word)
-        else:
-            # Word doesn't fit, start a new line
-            if current_line:  # Only append if we have content
-                lines.append(' '.join(current_line))
-            current_line = [word]
-    
-    # Add the last line
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return lines
+    return [line for line, _ in wrap_words(text, font, max_width)]
 
 
 def darken_image(img: Image.Image, factor: float = 0.7) -> Image.Image:
     """Darken an image to make text more readable"""
-    darkened = img.copy()
-    
-    # Create a dark semi-transparent overlay
-    overlay = Image.new('RGBA', img.size, (0, 0, 0, int(255 * (1 - factor))))
-    
-    # Paste the overlay onto the image
-    if darkened.mode == 'RGB':
-        darkened = darkened.convert('RGBA')
-    
-    darkened = Image.alpha_composite(darkened.convert('RGBA'), overlay)
-    darkened = darkened.convert('RGB')
-    
-    return darkened
\ No newline at end of file
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    return img.point(_darken_lut(factor))
+
+
+@functools.lru_cache(maxsize=8)
+def _darken_lut(factor: float) -> list:
+    """
+    Build the RGB lookup table for darken_image
+
+    Matches compositing a black overlay of opacity (1 - factor) onto the
+    image, rounded the same way Pillow's alpha_composite rounds.
+    """
+    keep = 255 - int(255 * (1 - factor))
+    return [(value * keep + 127) // 255 for value in range(256)] * 3
@@ -0,0 +1,346 @@
+"""
+Job Queue Module
+Asynchronous render jobs with status polling and backpressure
+"""
+import json
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Default limits
+DEFAULT_MAX_QUEUED = 50
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_FINISHED = 1000
+# Shared queue: how often idle workers look for new jobs, in seconds...
+DEFAULT_POLL_SECONDS = 0.5
+# ...and how long a job may run before it is assumed lost with its worker
+DEFAULT_STALE_SECONDS = 600
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted to a full queue"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue(ABC):
+    """
+    Interface for render job queues
+
+    Implementations store job records as plain dicts so a shared store
+    (e.g. a Redis list plus hashes) can back them across processes.
+    """
+
+    @abstractmethod
+    def submit(self, payload: Any) -> str:
+        """Enqueue a job and return its ID, or raise QueueFullError"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's record, or None if it is unknown"""
+
+    @abstractmethod
+    def depth(self) -> int:
+        """Number of jobs waiting to run"""
+
+
+class InProcessJobQueue(JobQueue):
+    """
+    Bounded in-process job queue served by a pool of worker threads
+
+    Finished job records are kept up to max_finished, oldest evicted first.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Any],
+        workers: int = DEFAULT_WORKERS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        max_finished: int = DEFAULT_MAX_FINISHED,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_finished = max_finished
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}                 # {job_id: record}
+        self._finished = OrderedDict()  # {job_id: None}, in completion order
+        self._lock = threading.Lock()
+        self._average_duration = 1.0
+        self._threads = []
+        self._threads_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker threads (threads do not survive fork)"""
+        with self._threads_lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload: Any) -> str:
+        job_id = uuid.uuid4().hex
+        record = {
+            "id": job_id,
+            "status": QUEUED,
+            "createdAt": time.time(),
+            "startedAt": None,
+            "finishedAt": None,
+            "result": None,
+            "error": None,
+        }
+
+        with self._lock:
+            self._jobs[job_id] = record
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise QueueFullError(self.retry_after())
+
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record is not None else None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def retry_after(self) -> int:
+        """Estimate in seconds until a queue slot frees up"""
+        return max(1, math.ceil(self._average_duration * self.depth() / max(self.workers, 1)))
+
+    def _work(self) -> None:
+        """Worker loop: run queued jobs and record their outcome"""
+        while True:
+            job_id, payload = self._queue.get()
+            start_time = time.time()
+            self._update(job_id, status=RUNNING, startedAt=start_time)
+
+            try:
+                result = self.handler(payload)
+                self._update(job_id, status=DONE, result=result)
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                self._update(job_id, status=FAILED, error=str(e))
+            finally:
+                duration = time.time() - start_time
+                self._average_duration = 0.8 * self._average_duration + 0.2 * duration
+                self._finish(job_id)
+                self._queue.task_done()
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _finish(self, job_id: str) -> None:
+        """Mark a job finished and evict the oldest finished records"""
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id]["finishedAt"] = time.time()
+            self._finished[job_id] = None
+            while len(self._finished) > self.max_finished:
+                evicted, _ = self._finished.popitem(last=False)
+                self._jobs.pop(evicted, None)
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a SQLite file, shared by every worker process on a host
+
+    Any process can submit a job or report its status. Each process that
+    calls start() runs worker threads that claim queued jobs in one write
+    transaction, so every job runs once. Payloads and results must be
+    JSON-serializable (tuples come back as lists).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        handler: Callable[[Any], Any],
+        workers: int = DEFAULT_WORKERS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        max_finished: int = DEFAULT_MAX_FINISHED,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+        stale_seconds: float = DEFAULT_STALE_SECONDS,
+    ):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._threads = []
+        self._threads_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS render_jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " payload TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS render_jobs_status ON render_jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (autocommit; transactions are explicit)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def start(self) -> None:
+        """Start this process's worker threads (threads do not survive fork)"""
+        with self._threads_lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload: Any) -> str:
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (queued,) = conn.execute("SELECT COUNT(*) FROM render_jobs WHERE status = ?", (QUEUED,)).fetchone()
+            if queued >= self.max_queued:
+                conn.execute("ROLLBACK")
+                raise QueueFullError(self.retry_after())
+            conn.execute(
+                "INSERT INTO render_jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload), time.time()),
+            )
+            conn.execute("COMMIT")
+        except QueueFullError:
+            raise
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT id, status, created_at, started_at, finished_at, result, error FROM render_jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        job_id, status, created_at, started_at, finished_at, result, error = row
+        return {
+            "id": job_id,
+            "status": status,
+            "createdAt": created_at,
+            "startedAt": started_at,
+            "finishedAt": finished_at,
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+        }
+
+    def depth(self) -> int:
+        (queued,) = self._connect().execute(
+            "SELECT COUNT(*) FROM render_jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()
+        return queued
+
+    def retry_after(self) -> int:
+        """Estimate in seconds until a queue slot frees up, from recent job durations"""
+        (average_duration,) = self._connect().execute(
+            "SELECT AVG(finished_at - started_at) FROM"
+            " (SELECT finished_at, started_at FROM render_jobs"
+            "  WHERE status = ? ORDER BY finished_at DESC LIMIT 20)",
+            (DONE,),
+        ).fetchone()
+        return max(1, math.ceil((average_duration or 1.0) * self.depth() / max(self.workers, 1)))
+
+    def _claim(self) -> Optional[tuple]:
+        """Take the oldest queued job, failing any whose worker has gone away"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE render_jobs SET status = ?, finished_at = ?, error = ?"
+                " WHERE status = ? AND started_at < ?",
+                (FAILED, now, "Job timed out", RUNNING, now - self.stale_seconds),
+            )
+            row = conn.execute(
+                "SELECT id, payload FROM render_jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE render_jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def _work(self) -> None:
+        """Worker loop: claim queued jobs, run them and record their outcome"""
+        while True:
+            try:
+                claimed = self._claim()
+            except Exception as e:
+                print(f"Error claiming render job: {e}")
+                claimed = None
+
+            if claimed is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+
+            job_id, payload = claimed
+            try:
+                result = self.handler(json.loads(payload))
+                self._finish(job_id, status=DONE, result=json.dumps(result))
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                self._finish(job_id, status=FAILED, error=str(e))
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Record a job's outcome, drop its payload and evict the oldest finished jobs"""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE render_jobs SET status = ?, finished_at = ?, result = ?, error = ?, payload = NULL WHERE id = ?",
+            (status, time.time(), result, error, job_id),
+        )
+        conn.execute(
+            "DELETE FROM render_jobs WHERE finished_at IS NOT NULL AND id NOT IN"
+            " (SELECT id FROM render_jobs WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?)",
+            (self.max_finished,),
+        )
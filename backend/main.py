@@ -2,14 +2,28 @@
 AutoQuoter - Main Flask Application
 Handles API routes for the quote generator
 """
-from flask import Flask, request, jsonify, send_file, render_template, send_from_directory
+from flask import Flask, Response, g, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
 import os
+import threading
 import time
-import json
-from quote_fetcher import get_quote_by_theme
-from image_creator import create_quote_image
-from utils import cleanup_old_files
+from concurrent.futures import ThreadPoolExecutor
+from batch_renderer import DEFAULT_RENDER_WORKERS, iter_render_batch
+from jobs import InProcessJobQueue, QueueFullError, SQLiteJobQueue
+from metrics import metrics, server_timing
+from quota import MemoryQuotaStore, SQLiteQuotaStore
+from quote_fetcher import (
+    get_corpus, get_prefetch_metrics, get_quote_by_theme, quote_aggregator, quote_cache, quote_client,
+    start_corpus_refresh, start_quote_prefetcher
+)
+from image_creator import (
+    MAX_QUOTE_LENGTH, OUTPUT_FORMATS, THEME_BACKGROUNDS, create_quote_image, get_background_for_theme,
+    get_output_format_for_theme, parse_size, preload_backgrounds, preload_fonts
+)
+from render_cache import RenderCache, make_render_key
+from retention import RetentionSweeper
+from storage import LocalDiskStorage
+from zip_stream import iter_zip
 
 # Get the base directory of the project
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -24,10 +38,102 @@ GENERATED_DIR = os.path.join(BASE_DIR, 'static', 'generated')
 FRONTEND_DIR = os.path.join(BASE_DIR, 'frontend')
 os.makedirs(GENERATED_DIR, exist_ok=True)
 
-# User tracking (temporary in-memory storage - would use a database in production)
-user_quotas = {}  # {ip_address: {count: int, last_reset: timestamp}}
+# Generated images, sharded into subdirectories of GENERATED_DIR by name
+image_storage = LocalDiskStorage(GENERATED_DIR, url_prefix='/static/generated')
+
+# Rendered images keyed by a hash of their inputs (memory LRU + image storage)
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+render_cache = RenderCache(image_storage, max_memory_bytes=RENDER_CACHE_MAX_BYTES)
+
+# Rendered images are written to disk off the request path (set False to keep them in memory only)
+PERSIST_GENERATED = True
+persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+
+# Generated files are pruned by a periodic background sweep. One worker
+# per host sweeps (whichever holds the lock file); the others read its report
+RETENTION_MAX_AGE_HOURS = 24
+RETENTION_MAX_FILES = 1000
+RETENTION_MAX_BYTES = 500 * 1024 * 1024
+RETENTION_INTERVAL_SECONDS = 300
+RETENTION_LOCK_PATH = os.path.join(BASE_DIR, 'data', 'retention.lock')
+retention_sweeper = RetentionSweeper(
+    image_storage,
+    max_age_hours=RETENTION_MAX_AGE_HOURS,
+    max_files=RETENTION_MAX_FILES,
+    max_bytes=RETENTION_MAX_BYTES,
+    interval_seconds=RETENTION_INTERVAL_SECONDS,
+    lock_path=RETENTION_LOCK_PATH
+)
+
+# Refresh the local quote corpus from remote APIs in the background
+QUOTE_REFRESH_ENABLED = True
+
+# Background buffer of ready-to-serve quotes per theme
+PREFETCH_ENABLED = True
+PREFETCH_DEPTH = 20          # Quotes buffered per theme
+PREFETCH_LOW_WATER = 5       # Refill a theme below this level
+PREFETCH_REFILL_RATE = 2.0   # Maximum quotes fetched per second
+
+# Sizes one /api/generate request can ask for at once
+MAX_SIZE_VARIANTS = 8
+
+# Batch generation
+BATCH_MAX_ITEMS = 500
+BATCH_RENDER_WORKERS = DEFAULT_RENDER_WORKERS  # Render processes per web worker
+
+# Asynchronous render jobs, shared by all workers through SQLite so a status
+# poll can land on any worker ("memory" keeps jobs per process)
+JOB_WORKERS = 2  # Job threads per web worker
+JOB_MAX_QUEUED = 50
+JOB_BACKEND = "sqlite"
+JOB_DB_PATH = os.path.join(BASE_DIR, 'data', 'jobs.sqlite3')
+
+# User quotas: a token bucket per IP, shared by all workers through SQLite
+# ("memory" keeps quotas per process)
 FREE_TIER_LIMIT = 5
 QUOTA_RESET_HOURS = 24
+QUOTA_BACKEND = "sqlite"
+QUOTA_DB_PATH = os.path.join(BASE_DIR, 'data', 'quotas.sqlite3')
+
+# Stage timers, cache/error counters, /metrics and Server-Timing headers
+# (when False, instrumentation calls return immediately)
+METRICS_ENABLED = True
+metrics.enabled = METRICS_ENABLED
+
+# Quote rendered once per theme before a worker is marked ready
+WARMUP_QUOTE = {"text": "The best way to predict the future is to create it.", "author": "Abraham Lincoln"}
+
+# Set once this process has warmed up and can serve traffic
+ready = threading.Event()
+
+if QUOTA_BACKEND == "sqlite":
+    quota_store = SQLiteQuotaStore(QUOTA_DB_PATH, FREE_TIER_LIMIT, QUOTA_RESET_HOURS * 3600)
+else:
+    quota_store = MemoryQuotaStore(FREE_TIER_LIMIT, QUOTA_RESET_HOURS * 3600)
+
+
+@app.before_request
+def start_request_metrics():
+    """Start collecting the stage breakdown of this request"""
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+        metrics.start_request()
+
+
+@app.after_request
+def finish_request_metrics(response):
+    """Record the request duration and report its stages in a Server-Timing header"""
+    breakdown = metrics.finish_request()
+    if breakdown is None or 'request_start' not in g:
+        return response
+    
+    duration = time.perf_counter() - g.request_start
+    metrics.observe("autoquoter_request_seconds", duration,
+                    endpoint=request.endpoint or "unknown", status=response.status_code)
+    
+    breakdown["total"] = duration
+    response.headers["Server-Timing"] = server_timing(breakdown)
+    return response
 
 
 @app.route('/')
@@ -49,110 +155,541 @@ def generate_quote():
         # Get client IP for tracking quota
         client_ip = request.remote_addr
         
-        # Check if user has exceeded quota
-        if not check_user_quota(client_ip):
-            return jsonify({"error": "Daily quota exceeded. Upgrade to premium for unlimited quotes."}), 429
-        
         # Parse request data
         data = request.json
-        theme = data.get('theme', 'motivation')
-        custom_quote = data.get('customQuote')
-        remove_watermark = data.get('removeWatermark', False)
-        
-        # Premium feature check (would be tied to actual auth in production)
-        if remove_watermark:
-            # For now, no one is premium
-            remove_watermark = False
-        
-        # Get quote text (either custom or from API)
-        if custom_quote:
-            quote_text = custom_quote
-            author = "Custom Quote"
-        else:
-            quote_data = get_quote_by_theme(theme)
-            quote_text = quote_data['text']
-            author = quote_data['author'] or "Unknown"
-        
-        # Generate a unique filename
-        timestamp = int(time.time())
-        filename = f"quote_{timestamp}.png"
-        output_path = os.path.join(GENERATED_DIR, filename)
-        
-        # Create the quote image
-        create_quote_image(
-            quote_text=quote_text,
-            author=author,
-            theme=theme,
-            output_path=output_path,
-            add_watermark=not remove_watermark
-        )
+        try:
+            with metrics.timer("resolve"):
+                sizes = parse_sizes(data)
+                job, cache_key = build_render_job(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": "Invalid request", "message": str(e)}), 400
+        
+        # Several sizes of the same quote are rendered together
+        if sizes is not None:
+            return generate_size_variants(client_ip, job, cache_key, sizes, data.get('output', 'zip'))
+        
+        extension = OUTPUT_FORMATS[job["output_format"]]["extension"]
         
-        # Increment user quota
-        increment_user_quota(client_ip)
+        # Let clients revalidate an image they already have for free
+        if request.if_none_match.contains(cache_key):
+            return Response(status=304, headers={"ETag": f'"{cache_key}"'})
         
-        # Cleanup old files
-        cleanup_old_files(GENERATED_DIR, max_age_hours=24, max_files=100)
+        # Check and use up the user's quota in one step
+        with metrics.timer("quota"):
+            allowed = consume_user_quota(client_ip)
+        if not allowed:
+            return jsonify({"error": "Daily quota exceeded. Upgrade to premium for unlimited quotes."}), 429
+        
+        encode_time = None
+        with metrics.timer("cache"):
+            image_data = render_cache.get(cache_key, extension)
+        if image_data is None:
+            # Create the quote image in memory
+            try:
+                encoded = create_quote_image(**job)
+            except Exception:
+                quota_store.refund(client_ip)
+                raise
+            image_data = encoded.buffer.getvalue()
+            encode_time = encoded.encode_time
+            render_cache.put(cache_key, image_data, write_to_disk=False)
+            
+            # Save a copy to disk in the background
+            if PERSIST_GENERATED:
+                persist_executor.submit(persist_generated_image, cache_key, image_data, extension)
         
-        # Return the generated image
-        return send_file(output_path, mimetype='image/png')
+        # Return the generated image with its size and encoding cost
+        response = Response(image_data, mimetype=OUTPUT_FORMATS[job["output_format"]]["mimetype"])
+        response.set_etag(cache_key)
+        response.headers["X-Image-Bytes"] = str(len(image_data))
+        if encode_time is not None:
+            response.headers["X-Encode-Time-Ms"] = f"{encode_time * 1000:.2f}"
+        return response
     
     except Exception as e:
         app.logger.error(f"Error generating quote: {str(e)}")
         return jsonify({"error": "Failed to generate quote image", "message": str(e)}), 500
 
 
-def check_user_quota(ip_address):
-    """Check if user has remaining quota"""
-    current_time = time.time()
+def generate_size_variants(client_ip, job, cache_key, sizes, output):
+    """Render one quote at several sizes and return every variant in a ZIP or a JSON manifest"""
+    if output not in ("zip", "manifest"):
+        return jsonify({"error": "Invalid request", "message": "output must be 'zip' or 'manifest'"}), 400
+    
+    extension = OUTPUT_FORMATS[job["output_format"]]["extension"]
+    variant_keys = [make_render_key(render=cache_key, size=list(size)) for size in sizes]
+    
+    # Each variant counts as one image against the quota
+    if not consume_user_quota(client_ip, len(sizes)):
+        return jsonify({"error": "Daily quota exceeded. Upgrade to premium for unlimited quotes."}), 429
+    
+    results = [render_cache.get(key, extension) for key in variant_keys]
+    pending = [index for index, image_data in enumerate(results) if image_data is None]
+    if pending:
+        # Render every missing size in one call so they share fonts and layout work
+        try:
+            encoded = create_quote_image(**job, sizes=[sizes[index] for index in pending])
+        except Exception:
+            quota_store.refund(client_ip, len(sizes))
+            raise
+        for index, variant in zip(pending, encoded):
+            results[index] = variant.buffer.getvalue()
+            render_cache.put(variant_keys[index], results[index], write_to_disk=False)
+            if PERSIST_GENERATED and output == "zip":
+                persist_executor.submit(persist_generated_image, variant_keys[index], results[index], extension)
+    
+    if output == "manifest":
+        variants = []
+        for (width, height), key, image_data in zip(sizes, variant_keys, results):
+            name = render_cache.write(key, image_data, extension)
+            retention_sweeper.record(name, len(image_data))
+            variants.append({
+                "size": f"{width}x{height}",
+                "url": image_storage.url_for(name),
+                "bytes": len(image_data),
+            })
+        return jsonify({
+            "theme": job["theme"],
+            "text": job["quote_text"],
+            "author": job["author"],
+            "format": job["output_format"],
+            "variants": variants,
+        })
+    
+    entries = [
+        (f"quote_{width}x{height}.{extension}", image_data)
+        for (width, height), image_data in zip(sizes, results)
+    ]
+    return Response(
+        iter_zip(entries),
+        mimetype='application/zip',
+        headers={"Content-Disposition": "attachment; filename=autoquoter-sizes.zip"}
+    )
+
+
+@app.route('/api/generate/batch', methods=['POST'])
+def generate_quote_batch():
+    """Generate many quote images in parallel, returned as a ZIP or a JSON manifest"""
+    try:
+        client_ip = request.remote_addr
+        data = request.json or {}
+        items = data.get('items') or []
+        output = data.get('output', 'zip')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Invalid request", "message": "items must be a non-empty list"}), 400
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({"error": "Invalid request", "message": f"A batch can hold at most {BATCH_MAX_ITEMS} items"}), 400
+        if output not in ("zip", "manifest"):
+            return jsonify({"error": "Invalid request", "message": "output must be 'zip' or 'manifest'"}), 400
+        
+        try:
+            resolved = [build_render_job(item) for item in items]
+        except (TypeError, ValueError, AttributeError) as e:
+            return jsonify({"error": "Invalid request", "message": str(e)}), 400
+        
+        # The whole batch must fit in the remaining quota
+        if not consume_user_quota(client_ip, len(items)):
+            return jsonify({"error": "Daily quota exceeded. Upgrade to premium for unlimited quotes."}), 429
+        
+        if output == "manifest":
+            try:
+                results = render_resolved_jobs(resolved)
+            except Exception:
+                quota_store.refund(client_ip, len(items))
+                raise
+            return jsonify({"items": write_manifest(resolved, results)})
+        
+        # Stream the ZIP, adding each image as soon as it is rendered
+        return Response(
+            stream_batch_zip(client_ip, resolved),
+            mimetype='application/zip',
+            headers={"Content-Disposition": "attachment; filename=autoquoter-batch.zip"}
+        )
+    
+    except Exception as e:
+        app.logger.error(f"Error generating quote batch: {str(e)}")
+        return jsonify({"error": "Failed to generate quote images", "message": str(e)}), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_render_job():
+    """Queue a render job and return its ID immediately"""
+    try:
+        client_ip = request.remote_addr
+        data = request.json or {}
+        
+        # Accept either a batch of items or a single /api/generate request body
+        items = data.get('items') if 'items' in data else [data]
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Invalid request", "message": "items must be a non-empty list"}), 400
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({"error": "Invalid request", "message": f"A job can hold at most {BATCH_MAX_ITEMS} items"}), 400
+        
+        try:
+            resolved = [build_render_job(item) for item in items]
+        except (TypeError, ValueError, AttributeError) as e:
+            return jsonify({"error": "Invalid request", "message": str(e)}), 400
+        
+        if not consume_user_quota(client_ip, len(items)):
+            return jsonify({"error": "Daily quota exceeded. Upgrade to premium for unlimited quotes."}), 429
+        
+        job_queue.start()
+        try:
+            job_id = job_queue.submit(resolved)
+        except QueueFullError as e:
+            quota_store.refund(client_ip, len(items))
+            response = jsonify({"error": "Too many queued jobs. Please retry later."})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response
+        
+        status_url = f"/api/jobs/{job_id}"
+        response = jsonify({"jobId": job_id, "status": "queued", "statusUrl": status_url})
+        response.status_code = 202
+        response.headers["Location"] = status_url
+        return response
+    
+    except Exception as e:
+        app.logger.error(f"Error queueing render job: {str(e)}")
+        return jsonify({"error": "Failed to queue render job", "message": str(e)}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_render_job(job_id):
+    """Get a render job's status and, once done, its result location"""
+    record = job_queue.get(job_id)
+    if record is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify({
+        "jobId": record["id"],
+        "status": record["status"],
+        "createdAt": record["createdAt"],
+        "startedAt": record["startedAt"],
+        "finishedAt": record["finishedAt"],
+        "items": record["result"],
+        "error": record["error"]
+    })
+
+
+def run_render_job(resolved):
+    """Job queue handler: render a job's images and write them to disk"""
+    return write_manifest(resolved, render_resolved_jobs(resolved))
+
+
+def render_resolved_jobs(resolved):
+    """
+    Render (job, cache_key) pairs, using the render cache where possible
+    
+    Returns:
+        Encoded image bytes for each job, in order
+    """
+    return list(iter_resolved_jobs(resolved))
+
+
+def iter_resolved_jobs(resolved):
+    """
+    Render (job, cache_key) pairs, yielding each image in order as soon as it is ready
+    
+    Cache hits come from the render cache; misses are all submitted to the
+    render process pool up front.
+    """
+    results = [render_cache.get(cache_key, OUTPUT_FORMATS[job["output_format"]]["extension"])
+               for job, cache_key in resolved]
+    pending = [resolved[index][0] for index, image_data in enumerate(results) if image_data is None]
+    rendered = iter_render_batch(pending, max_workers=BATCH_RENDER_WORKERS)
+    
+    for (job, cache_key), image_data in zip(resolved, results):
+        if image_data is None:
+            image_data = next(rendered)["data"]
+            render_cache.put(cache_key, image_data, write_to_disk=False)
+        yield image_data
+
+
+def stream_batch_zip(client_ip, resolved):
+    """
+    Yield a batch's images as a ZIP archive, one entry per image as it is rendered
+    
+    If rendering fails part way, the quota for the images not yet sent is
+    refunded and the stream is cut off.
+    """
+    delivered = 0
+    
+    def entries():
+        nonlocal delivered
+        for index, ((job, _), image_data) in enumerate(zip(resolved, iter_resolved_jobs(resolved))):
+            extension = OUTPUT_FORMATS[job["output_format"]]["extension"]
+            yield f"quote_{index + 1:03d}.{extension}", image_data
+            delivered += 1
+    
+    try:
+        yield from iter_zip(entries())
+    except Exception as e:
+        quota_store.refund(client_ip, len(resolved) - delivered)
+        app.logger.error(f"Error streaming quote batch: {str(e)}")
+        raise
+
+
+def write_manifest(resolved, results):
+    """Write rendered images to disk and describe where to fetch them"""
+    manifest = []
+    for (job, cache_key), image_data in zip(resolved, results):
+        extension = OUTPUT_FORMATS[job["output_format"]]["extension"]
+        name = render_cache.write(cache_key, image_data, extension)
+        retention_sweeper.record(name, len(image_data))
+        manifest.append({
+            "url": image_storage.url_for(name),
+            "theme": job["theme"],
+            "text": job["quote_text"],
+            "author": job["author"],
+            "format": job["output_format"],
+            "bytes": len(image_data),
+        })
+    return manifest
+
+
+# Render jobs queued through /api/jobs
+if JOB_BACKEND == "sqlite":
+    job_queue = SQLiteJobQueue(JOB_DB_PATH, run_render_job, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED)
+else:
+    job_queue = InProcessJobQueue(run_render_job, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED)
+
+
+def build_render_job(data):
+    """
+    Resolve request data into create_quote_image arguments and a cache key
+    
+    Raises:
+        ValueError: If the format or encoder options are invalid
+    """
+    theme = data.get('theme', 'motivation')
+    custom_quote = data.get('customQuote')
+    remove_watermark = data.get('removeWatermark', False)
+    auto_fit = bool(data.get('autoFit', False))
+    output_format = (data.get('format') or get_output_format_for_theme(theme)).lower()
+    
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(OUTPUT_FORMATS)}")
+    encode_options = parse_encode_options(data, output_format)
+    
+    # Premium feature check (would be tied to actual auth in production)
+    if remove_watermark:
+        # For now, no one is premium
+        remove_watermark = False
+    
+    # Get quote text (either custom or from API)
+    if custom_quote:
+        if len(custom_quote) > MAX_QUOTE_LENGTH:
+            raise ValueError(f"Quotes can be at most {MAX_QUOTE_LENGTH} characters")
+        quote_text = custom_quote
+        author = "Custom Quote"
+    else:
+        quote_data = get_quote_by_theme(theme)
+        quote_text = quote_data['text']
+        author = quote_data['author'] or "Unknown"
     
-    # If user not in tracking, add them
-    if ip_address not in user_quotas:
-        user_quotas[ip_address] = {"count": 0, "last_reset": current_time}
-        return True
+    # Pick the background up front so it is part of the cache key; seeding
+    # the pick with the quote gives a resubmitted request the same key
+    background_path = get_background_for_theme(theme, seed=f"{theme}\n{quote_text}\n{author}")
+    cache_key = make_render_key(
+        theme=theme,
+        quote_text=quote_text,
+        author=author,
+        add_watermark=not remove_watermark,
+        background=os.path.basename(background_path) if background_path else None,
+        output_format=output_format,
+        encode_options=encode_options,
+        auto_fit=auto_fit,
+    )
     
-    # Check if we should reset quota (24 hours passed)
-    user_data = user_quotas[ip_address]
-    hours_passed = (current_time - user_data["last_reset"]) / 3600
+    job = {
+        "quote_text": quote_text,
+        "author": author,
+        "theme": theme,
+        "add_watermark": not remove_watermark,
+        "background_path": background_path,
+        "output_format": output_format,
+        "encode_options": encode_options,
+        "auto_fit": auto_fit,
+    }
+    return job, cache_key
+
+
+def parse_sizes(data):
+    """
+    Read the optional list of output sizes from request data
+    
+    Returns:
+        Distinct (width, height) tuples in request order, or None for a single default-size image
+    
+    Raises:
+        ValueError: If the list or any size in it is invalid
+    """
+    requested = data.get('sizes')
+    if requested is None:
+        return None
+    if not isinstance(requested, list) or not requested:
+        raise ValueError("sizes must be a non-empty list")
     
-    if hours_passed >= QUOTA_RESET_HOURS:
-        user_quotas[ip_address] = {"count": 0, "last_reset": current_time}
-        return True
+    sizes = list(dict.fromkeys(parse_size(size) for size in requested))
+    if len(sizes) > MAX_SIZE_VARIANTS:
+        raise ValueError(f"At most {MAX_SIZE_VARIANTS} sizes can be requested at once")
+    return sizes
+
+
+def parse_encode_options(data, output_format):
+    """Read optional encoder settings for a format from request data"""
+    options = {}
+    
+    if output_format == "png":
+        if data.get('compressLevel') is not None:
+            options["compress_level"] = min(max(int(data['compressLevel']), 0), 9)
+    else:
+        if data.get('quality') is not None:
+            options["quality"] = min(max(int(data['quality']), 1), 100)
+        if output_format == "jpeg" and data.get('progressive') is not None:
+            options["progressive"] = bool(data['progressive'])
+        if output_format == "webp" and data.get('method') is not None:
+            options["method"] = min(max(int(data['method']), 0), 6)
     
-    # Check if user still has quota
-    return user_data["count"] < FREE_TIER_LIMIT
+    return options
 
 
-def increment_user_quota(ip_address):
-    """Increment user's quote count"""
-    if ip_address in user_quotas:
-        user_quotas[ip_address]["count"] += 1
+def persist_generated_image(cache_key, image_data, extension):
+    """Write a rendered image to disk"""
+    try:
+        name = render_cache.write(cache_key, image_data, extension)
+        retention_sweeper.record(name, len(image_data))
+    except Exception as e:
+        app.logger.error(f"Error saving generated image: {str(e)}")
+
+
+def consume_user_quota(ip_address, count=1):
+    """Check and use up a user's quota atomically; False if not enough is left"""
+    allowed, _ = quota_store.consume(ip_address, count)
+    if not allowed:
+        metrics.inc("autoquoter_quota_rejections_total")
+    return allowed
 
 
 @app.route('/api/quota', methods=['GET'])
 def get_user_quota():
     """Get user's remaining quota"""
     client_ip = request.remote_addr
-    
-    if client_ip not in user_quotas:
-        remaining = FREE_TIER_LIMIT
-    else:
-        user_data = user_quotas[client_ip]
-        
-        # Check if we should reset
-        current_time = time.time()
-        hours_passed = (current_time - user_data["last_reset"]) / 3600
-        
-        if hours_passed >= QUOTA_RESET_HOURS:
-            remaining = FREE_TIER_LIMIT
-        else:
-            remaining = FREE_TIER_LIMIT - user_data["count"]
+    remaining = quota_store.remaining(client_ip)
     
     return jsonify({
         "remaining": remaining,
-        "limit": FREE_TIER_LIMIT,
+        "limit": quota_store.limit,
         "isPremium": False  # Would be tied to auth in production
     })
 
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get quote prefetch queue, quote source and retention metrics"""
+    generated_files, generated_bytes = retention_sweeper.totals()
+    last_sweep = retention_sweeper.last_report
+    return jsonify({
+        "quotePrefetch": get_prefetch_metrics(),
+        "quoteSources": quote_client.get_stats(),
+        "quoteAggregator": quote_aggregator.get_stats(),
+        "quoteCache": quote_cache.entries(),
+        "retention": {
+            "files": generated_files,
+            "bytes": generated_bytes,
+            "lastSweep": last_sweep._asdict() if last_sweep else None
+        }
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+    """Export stage timings, counters and queue/storage gauges in the Prometheus text format"""
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    
+    generated_files, generated_bytes = retention_sweeper.totals()
+    metrics.set_gauge("autoquoter_generated_files", generated_files)
+    metrics.set_gauge("autoquoter_generated_bytes", generated_bytes)
+    metrics.set_gauge("autoquoter_job_queue_depth", job_queue.depth())
+    for entry in quote_cache.entries():
+        if entry["ageSeconds"] is not None:
+            metrics.set_gauge("autoquoter_quote_cache_age_seconds", entry["ageSeconds"], source=entry["source"])
+    if retention_sweeper.last_report is not None:
+        metrics.set_gauge("autoquoter_retention_sweep_seconds", retention_sweeper.last_report.duration)
+    
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/ready', methods=['GET'])
+def get_readiness():
+    """
+    Readiness probe: 200 once this worker has warmed up and its quota and
+    job stores answer, 503 with the failing checks otherwise
+    """
+    checks = {"warmup": "ok" if ready.is_set() else "starting"}
+    for name, probe in (("quota", lambda: quota_store.remaining("readiness-probe")), ("jobs", job_queue.depth)):
+        try:
+            probe()
+            checks[name] = "ok"
+        except Exception as e:
+            checks[name] = f"error: {e}"
+    
+    if any(status != "ok" for status in checks.values()):
+        return jsonify({"status": "unavailable", "checks": checks}), 503
+    return jsonify({"status": "ready", "checks": checks})
+
+
+def preload_assets():
+    """
+    Load backgrounds, fonts and the quote corpus
+    
+    Under gunicorn with preload_app this runs once in the master, and the
+    workers share the loaded data copy-on-write.
+    """
+    preload_backgrounds()
+    preload_fonts()
+    get_corpus()
+
+
+def start_background_tasks():
+    """
+    Start the corpus refresh, quote prefetcher, retention sweeper and render job threads
+    
+    Threads do not survive fork, so under gunicorn this runs in each worker.
+    """
+    # Remote quote APIs only top up the local corpus in the background
+    if QUOTE_REFRESH_ENABLED:
+        start_corpus_refresh()
+    
+    if PREFETCH_ENABLED:
+        start_quote_prefetcher(PREFETCH_DEPTH, PREFETCH_LOW_WATER, PREFETCH_REFILL_RATE)
+    
+    retention_sweeper.start()
+    
+    # Every worker takes jobs from the shared queue, not just the one that received them
+    job_queue.start()
+
+
+def warm_up():
+    """Render one image per theme so the first real requests hit warm paths, then mark ready"""
+    start_time = time.perf_counter()
+    for theme in THEME_BACKGROUNDS:
+        try:
+            create_quote_image(WARMUP_QUOTE["text"], WARMUP_QUOTE["author"], theme)
+        except Exception as e:
+            app.logger.error(f"Error warming up theme {theme}: {str(e)}")
+    
+    ready.set()
+    app.logger.info(f"Warm-up finished in {time.perf_counter() - start_time:.2f}s")
+
+
 if __name__ == '__main__':
+    # Development server; production runs gunicorn with gunicorn.conf.py
+    preload_assets()
+    start_background_tasks()
+    warm_up()
+    
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Metrics Module
+Lightweight stage timers, counters and histograms with Prometheus text export
+
+Metrics live in the process that records them: each worker process keeps
+its own registry, and renders done in the batch process pool are not
+counted by the web process.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metric descriptions for the # HELP lines
+METRIC_HELP = {
+    "autoquoter_stage_seconds": "Time spent in each stage of quote selection and rendering",
+    "autoquoter_request_seconds": "HTTP request duration by endpoint",
+    "autoquoter_upstream_seconds": "Remote quote API call duration by source",
+    "autoquoter_cache_requests_total": "Cache lookups by cache and result",
+    "autoquoter_quotes_served_total": "Quotes served by where they came from",
+    "autoquoter_upstream_errors_total": "Failed remote quote API calls by source",
+    "autoquoter_upstream_rejected_total": "Remote quote API calls skipped by an open circuit",
+    "autoquoter_quota_rejections_total": "Requests rejected for exceeding the quota",
+    "autoquoter_quote_aggregations_total": "Live quote lookups by winning source, or why none won",
+    "autoquoter_quote_hedges_total": "Hedged calls started while an earlier source was still running",
+    "autoquoter_quote_cache_age_seconds": "Age of each cached quote API response",
+    "autoquoter_generated_files": "Generated images currently stored",
+    "autoquoter_generated_bytes": "Total size of the generated images currently stored",
+    "autoquoter_job_queue_depth": "Render jobs waiting to run",
+    "autoquoter_retention_sweep_seconds": "Duration of the last retention sweep",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _StageTimer:
+    """Context manager timing one stage"""
+
+    __slots__ = ("registry", "stage", "start_time")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record_stage(self.stage, time.perf_counter() - self.start_time)
+        return False
+
+
+class _NullTimer:
+    """Shared do-nothing timer handed out while metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms
+
+    Stage timings also go into a per-thread breakdown of the current
+    request (see start_request and server_timing). While disabled, every
+    call returns right after checking `enabled`.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._counters = {}    # {name: {labels: value}}
+        self._gauges = {}      # {name: {labels: value}}
+        self._histograms = {}  # {name: {labels: Histogram}}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def timer(self, stage: str):
+        """Time a with-block as a stage of the current request"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        """Record a stage duration measured elsewhere"""
+        if not self.enabled:
+            return
+        self._observe("autoquoter_stage_seconds", (("stage", stage),), seconds)
+
+        breakdown = getattr(self._local, "breakdown", None)
+        if breakdown is not None:
+            breakdown[stage] = breakdown.get(stage, 0.0) + seconds
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Increment a counter"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to a value"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Add a value to a histogram"""
+        if not self.enabled:
+            return
+        self._observe(name, _label_key(labels), value)
+
+    def _observe(self, name: str, key: Labels, value: float) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def start_request(self) -> None:
+        """Start collecting a stage breakdown for the request on this thread"""
+        if self.enabled:
+            self._local.breakdown = {}
+
+    def finish_request(self) -> Optional[Dict[str, float]]:
+        """Stop collecting and return this thread's {stage: seconds} breakdown"""
+        breakdown = getattr(self._local, "breakdown", None)
+        self._local.breakdown = None
+        return breakdown
+
+    def render_prometheus(self) -> str:
+        """Export every metric in the Prometheus text format (version 0.0.4)"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {
+                name: {key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+        lines = []
+        for name in sorted(counters):
+            _write_header(lines, name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(gauges):
+            _write_header(lines, name, "gauge")
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(histograms):
+            _write_header(lines, name, "histogram")
+            for key, (buckets, counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(breakdown: Dict[str, float]) -> str:
+    """Format a {stage: seconds} breakdown as a Server-Timing header value"""
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in breakdown.items())
+
+
+def _label_key(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    pairs = []
+    for name, value in key:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _write_header(lines: List[str], name: str, kind: str) -> None:
+    if name in METRIC_HELP:
+        lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+# Registry shared by the whole process
+metrics = MetricsRegistry()
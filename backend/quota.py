@@ -0,0 +1,184 @@
+"""
+Quota Module
+Token-bucket quotas with atomic check-and-consume and idle-entry eviction
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+# How often idle entries are swept, in seconds
+EVICTION_INTERVAL_SECONDS = 60
+
+
+class QuotaStore(ABC):
+    """
+    Interface for quota backends
+
+    Each key gets a token bucket holding up to `limit` tokens that refills
+    at `limit` tokens per `window_seconds`. A bucket that has been idle for
+    a whole window is full again, so its entry can be dropped: memory use
+    is O(1) per active key.
+    """
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.refill_rate = limit / window_seconds
+        self._last_eviction = time.monotonic()
+
+    @abstractmethod
+    def consume(self, key: str, cost: int = 1) -> Tuple[bool, int]:
+        """
+        Atomically take `cost` tokens from a key's bucket if it has enough
+
+        Returns:
+            (allowed, remaining) where remaining is the whole tokens left
+        """
+
+    @abstractmethod
+    def refund(self, key: str, cost: int = 1) -> None:
+        """Give back tokens for work that was consumed but not delivered"""
+
+    @abstractmethod
+    def remaining(self, key: str) -> int:
+        """Whole tokens currently available to a key"""
+
+    @abstractmethod
+    def evict_idle(self) -> int:
+        """Drop entries whose buckets have refilled completely"""
+
+    def _refill(self, tokens: float, updated_at: float, now: float) -> float:
+        """Tokens in a bucket after refilling it up to now"""
+        return min(self.limit, tokens + (now - updated_at) * self.refill_rate)
+
+    def _maybe_evict(self) -> None:
+        """Sweep idle entries at most once per EVICTION_INTERVAL_SECONDS"""
+        now = time.monotonic()
+        if now - self._last_eviction >= EVICTION_INTERVAL_SECONDS:
+            self._last_eviction = now
+            self.evict_idle()
+
+
+class MemoryQuotaStore(QuotaStore):
+    """Per-process quota store, safe across threads"""
+
+    def __init__(self, limit: int, window_seconds: float):
+        super().__init__(limit, window_seconds)
+        self._buckets = {}  # {key: (tokens, updated_at)}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, cost: int = 1) -> Tuple[bool, int]:
+        self._maybe_evict()
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.limit, now))
+            tokens = self._refill(tokens, updated_at, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+        return allowed, math.floor(tokens)
+
+    def refund(self, key: str, cost: int = 1) -> None:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.limit, now))
+            self._buckets[key] = (min(self.limit, self._refill(tokens, updated_at, now) + cost), now)
+
+    def remaining(self, key: str) -> int:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.limit, now))
+        return math.floor(self._refill(tokens, updated_at, now))
+
+    def evict_idle(self) -> int:
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            idle = [key for key, (_, updated_at) in self._buckets.items() if updated_at <= cutoff]
+            for key in idle:
+                del self._buckets[key]
+        return len(idle)
+
+
+class SQLiteQuotaStore(QuotaStore):
+    """
+    Quota store in a SQLite file, shared by every worker process on a host
+
+    Each check-and-consume runs in a single write transaction.
+    """
+
+    def __init__(self, path: str, limit: int, window_seconds: float):
+        super().__init__(limit, window_seconds)
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_buckets ("
+            " key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS quota_buckets_updated_at ON quota_buckets (updated_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (autocommit; transactions are explicit)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _update(self, key: str, cost: int, consume: bool) -> Tuple[bool, float]:
+        """Refill a bucket, then take (consume=True) or give back `cost` tokens"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM quota_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = self._refill(*row, now) if row else float(self.limit)
+
+            allowed = True
+            if consume:
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+            else:
+                tokens = min(self.limit, tokens + cost)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO quota_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, tokens
+
+    def consume(self, key: str, cost: int = 1) -> Tuple[bool, int]:
+        self._maybe_evict()
+        allowed, tokens = self._update(key, cost, consume=True)
+        return allowed, math.floor(tokens)
+
+    def refund(self, key: str, cost: int = 1) -> None:
+        self._update(key, cost, consume=False)
+
+    def remaining(self, key: str) -> int:
+        row = self._connect().execute(
+            "SELECT tokens, updated_at FROM quota_buckets WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return self.limit
+        return math.floor(self._refill(*row, time.time()))
+
+    def evict_idle(self) -> int:
+        cutoff = time.time() - self.window_seconds
+        cursor = self._connect().execute("DELETE FROM quota_buckets WHERE updated_at <= ?", (cutoff,))
+        return cursor.rowcount
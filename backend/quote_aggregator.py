@@ -0,0 +1,218 @@
+"""
+Quote Aggregator Module
+Races remote quote sources with hedged requests under a per-call deadline
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import metrics
+
+# Give up on the remote sources after this many seconds
+DEFAULT_DEADLINE_SECONDS = 1.5
+# Start the next source once the previous one is slower than this percentile...
+HEDGE_PERCENTILE = 0.95
+# ...or after this delay, until a source has enough latency samples
+DEFAULT_HEDGE_DELAY_SECONDS = 0.3
+MIN_HEDGE_DELAY_SECONDS = 0.05
+MIN_LATENCY_SAMPLES = 10
+LATENCY_WINDOW = 100  # Recent call durations kept per source
+# Races run at once per process; the source thread pool gets one thread per
+# source per race, so a hedge never waits behind other calls for a thread
+DEFAULT_MAX_CONCURRENT_FETCHES = 8
+
+QuoteSource = Callable[[str], Optional[Dict[str, str]]]
+QuoteCheck = Callable[[str, str, Dict[str, str]], bool]
+
+
+def has_text(theme: str, source: str, quote: Dict[str, str]) -> bool:
+    """Default check: any quote with text is valid"""
+    return bool(quote.get("text"))
+
+
+class QuoteAggregator:
+    """
+    Asks several quote sources for a quote and keeps the first valid answer
+
+    Sources are given in order of preference. The first starts at once;
+    each next one starts when the sources already running have not
+    answered within the last one's p95 latency, or as soon as one of them
+    fails. The first valid quote wins and the other calls are cancelled.
+
+    Sources are blocking callables run on a thread pool, so a call that
+    is already running when it is cancelled finishes in the background and
+    its result is dropped. Until it does, that source is skipped, which
+    keeps at most max_concurrent_fetches calls per source holding a
+    thread. Races beyond max_concurrent_fetches give up at once. The event
+    loop runs in a daemon thread, which lets synchronous code such as a
+    Flask view call fetch.
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, QuoteSource],
+        is_valid: QuoteCheck = has_text,
+        deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+        max_concurrent_fetches: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+    ):
+        self.sources = sources
+        self.is_valid = is_valid
+        self.deadline_seconds = deadline_seconds
+        self.max_concurrent_fetches = max_concurrent_fetches
+        self.max_workers = max(1, len(sources) * max_concurrent_fetches)
+
+        self._latencies = {name: deque(maxlen=LATENCY_WINDOW) for name in sources}
+        # Calls dropped by a finished race that are still running, per source
+        self._abandoned = {name: 0 for name in sources}
+        self._active_fetches = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._executor = None
+        self._pid = None
+
+    def fetch(self, theme: str, source_names: List[str], deadline_seconds: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """
+        Get a quote for a theme from the first source to return a valid one
+
+        Returns:
+            The quote, or None if no source gave a valid quote before the deadline
+        """
+        if deadline_seconds is None:
+            deadline_seconds = self.deadline_seconds
+
+        with self._lock:
+            if self._active_fetches >= self.max_concurrent_fetches:
+                metrics.inc("autoquoter_quote_aggregations_total", result="saturated")
+                return None
+            self._active_fetches += 1
+
+        future = asyncio.run_coroutine_threadsafe(
+            self.fetch_async(theme, source_names, deadline_seconds), self._get_loop()
+        )
+        try:
+            # The coroutine enforces the deadline; the extra second only
+            # guards against a stuck event loop
+            return future.result(timeout=deadline_seconds + 1)
+        except Exception as e:
+            future.cancel()
+            print(f"Error aggregating {theme} quote: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._active_fetches -= 1
+
+    async def fetch_async(self, theme: str, source_names: List[str], deadline_seconds: float) -> Optional[Dict[str, str]]:
+        """Coroutine version of fetch, for callers already running an event loop"""
+        try:
+            quote = await asyncio.wait_for(self._race(theme, source_names), deadline_seconds)
+        except asyncio.TimeoutError:
+            metrics.inc("autoquoter_quote_aggregations_total", result="deadline")
+            return None
+
+        if quote is None:
+            metrics.inc("autoquoter_quote_aggregations_total", result="exhausted")
+        return quote
+
+    async def _race(self, theme: str, source_names: List[str]) -> Optional[Dict[str, str]]:
+        """Start the sources one after another as hedges until one returns a valid quote"""
+        loop = asyncio.get_running_loop()
+        waiting = [name for name in dict.fromkeys(source_names) if name in self.sources]
+        running = {}  # {future: (source name, call state)}
+
+        try:
+            while waiting or running:
+                timeout = None
+                if waiting:
+                    name = waiting.pop(0)
+                    with self._lock:
+                        busy = self._abandoned[name] > 0
+                    if busy:
+                        # A call from an earlier race is still holding a thread
+                        metrics.inc("autoquoter_quote_sources_skipped_total", source=name)
+                        continue
+                    if running:
+                        metrics.inc("autoquoter_quote_hedges_total", source=name)
+                    state = {"finished": False, "abandoned": False}
+                    running[loop.run_in_executor(self._executor, self._call, name, theme, state)] = (name, state)
+                    if waiting:
+                        timeout = self.hedge_delay(name)
+
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    name, _ = running.pop(future)
+                    quote = future.result()
+                    if quote and self.is_valid(theme, name, quote):
+                        metrics.inc("autoquoter_quote_aggregations_total", result=name)
+                        return quote
+        finally:
+            with self._lock:
+                for future, (name, state) in running.items():
+                    future.cancel()
+                    if not state["finished"]:
+                        state["abandoned"] = True
+                        self._abandoned[name] += 1
+
+        return None
+
+    def _call(self, name: str, theme: str, state: Dict[str, bool]) -> Optional[Dict[str, str]]:
+        """Run one source on the thread pool, recording how long it took"""
+        start_time = time.perf_counter()
+        try:
+            return self.sources[name](theme)
+        except Exception as e:
+            print(f"Error fetching {theme} quote from {name}: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._latencies[name].append(time.perf_counter() - start_time)
+                state["finished"] = True
+                if state["abandoned"]:
+                    self._abandoned[name] -= 1
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a source before starting the next one"""
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        delay = samples[math.ceil(HEDGE_PERCENTILE * len(samples)) - 1]
+        return min(max(delay, MIN_HEDGE_DELAY_SECONDS), self.deadline_seconds)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the event loop thread, starting it on first use (and again after a fork)"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="quote-source")
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="quote-aggregator", daemon=True).start()
+                self._pid = os.getpid()
+            return self._loop
+
+    def close(self) -> None:
+        """Stop the event loop thread and the source thread pool"""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = None
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the deadline and each source's latency samples, hedge delay and abandoned calls"""
+        return {
+            "deadlineSeconds": self.deadline_seconds,
+            "sources": {
+                name: {
+                    "samples": len(self._latencies[name]),
+                    "hedgeDelaySeconds": round(self.hedge_delay(name), 4),
+                    "abandonedCalls": self._abandoned[name],
+                }
+                for name in self.sources
+            },
+        }
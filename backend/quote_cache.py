@@ -0,0 +1,191 @@
+"""
+Quote Cache Module
+Persistent cache of remote quote API responses, shared by every worker through SQLite
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from metrics import metrics
+
+# Entries are fresh for this many seconds unless their source has its own TTL...
+DEFAULT_TTL_SECONDS = 3600
+# ...then served stale while one worker refreshes them, for up to this long
+DEFAULT_MAX_STALE_SECONDS = 7 * 24 * 3600
+# A refresh lease expires after this many seconds, in case its owner died
+DEFAULT_LEASE_SECONDS = 60
+# Workers that find no usable entry wait this long for the one refreshing it
+DEFAULT_WAIT_SECONDS = 10
+WAIT_POLL_SECONDS = 0.1
+
+
+class CacheEntry(NamedTuple):
+    """A cached response and when it was fetched (Unix time)"""
+    value: Any
+    fetched_at: float
+
+
+class QuoteCache:
+    """
+    Per-source cache of decoded API responses in a SQLite file
+
+    A fresh entry is served as is. A stale entry is served while a
+    background thread refreshes it. With no usable entry, the caller
+    fetches and waits. In both cases a lease row makes sure only one
+    thread in one worker calls the source at a time (single-flight);
+    the others serve stale data or wait for the new entry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        max_stale_seconds: float = DEFAULT_MAX_STALE_SECONDS,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        wait_seconds: float = DEFAULT_WAIT_SECONDS,
+    ):
+        self.path = path
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.max_stale_seconds = max_stale_seconds
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quote_cache ("
+            " source TEXT PRIMARY KEY,"
+            " payload TEXT,"
+            " fetched_at REAL,"
+            " lease_until REAL NOT NULL DEFAULT 0)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (autocommit)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def ttl(self, source: str) -> float:
+        """Seconds an entry from a source stays fresh"""
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, source: str, fetch: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Get a source's cached response, fetching or refreshing it as needed
+
+        Args:
+            source: Cache key, usually the API name
+            fetch: Calls the API; returns the decoded response or None on failure
+
+        Returns:
+            The cached or fetched response, or None if there is none
+        """
+        entry = self.read(source)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < self.ttl(source):
+                metrics.inc("autoquoter_cache_requests_total", cache="quotes", result="hit")
+                return entry.value
+
+            if age < self.ttl(source) + self.max_stale_seconds:
+                metrics.inc("autoquoter_cache_requests_total", cache="quotes", result="stale")
+                if self._acquire_lease(source):
+                    threading.Thread(
+                        target=self._refresh, args=(source, fetch), name=f"quote-cache-{source}", daemon=True
+                    ).start()
+                return entry.value
+
+        # Nothing usable: one caller fetches while the others wait for it
+        metrics.inc("autoquoter_cache_requests_total", cache="quotes", result="miss")
+        if self._acquire_lease(source):
+            value = self._refresh(source, fetch)
+        else:
+            value = self._wait_for(source, entry.fetched_at if entry else 0)
+
+        if value is None and entry is not None:
+            return entry.value
+        return value
+
+    def read(self, source: str) -> Optional[CacheEntry]:
+        """Get a source's entry regardless of its age"""
+        row = self._connect().execute(
+            "SELECT payload, fetched_at FROM quote_cache WHERE source = ? AND payload IS NOT NULL", (source,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1])
+
+    def _acquire_lease(self, source: str) -> bool:
+        """Claim the right to refresh a source, unless another caller holds it"""
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO quote_cache (source, lease_until) VALUES (?, ?)"
+            " ON CONFLICT (source) DO UPDATE SET lease_until = excluded.lease_until"
+            " WHERE quote_cache.lease_until <= ?",
+            (source, now + self.lease_seconds, now),
+        )
+        return cursor.rowcount == 1
+
+    def _refresh(self, source: str, fetch: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Fetch a source and store the response, then release the lease"""
+        try:
+            value = fetch()
+        except Exception as e:
+            print(f"Error refreshing cached {source} quotes: {e}")
+            value = None
+
+        conn = self._connect()
+        if value is None:
+            conn.execute("UPDATE quote_cache SET lease_until = 0 WHERE source = ?", (source,))
+        else:
+            conn.execute(
+                "UPDATE quote_cache SET payload = ?, fetched_at = ?, lease_until = 0 WHERE source = ?",
+                (json.dumps(value), time.time(), source),
+            )
+        return value
+
+    def _wait_for(self, source: str, fetched_after: float) -> Optional[Any]:
+        """Wait for another caller's refresh to store a newer entry or give up"""
+        conn = self._connect()
+        give_up_at = time.monotonic() + self.wait_seconds
+        while time.monotonic() < give_up_at:
+            time.sleep(WAIT_POLL_SECONDS)
+            row = conn.execute(
+                "SELECT payload, fetched_at, lease_until FROM quote_cache WHERE source = ?", (source,)
+            ).fetchone()
+            if row is None:
+                break
+            payload, fetched_at, lease_until = row
+            if payload is not None and fetched_at > fetched_after:
+                return json.loads(payload)
+            if lease_until <= time.time():
+                break
+        return None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Describe every entry: when it was fetched, its age and whether it is fresh"""
+        now = time.time()
+        rows = self._connect().execute(
+            "SELECT source, fetched_at, lease_until FROM quote_cache ORDER BY source"
+        ).fetchall()
+        return [
+            {
+                "source": source,
+                "fetchedAt": fetched_at,
+                "ageSeconds": round(now - fetched_at, 1) if fetched_at else None,
+                "ttlSeconds": self.ttl(source),
+                "fresh": bool(fetched_at) and now - fetched_at < self.ttl(source),
+                "refreshing": lease_until > now,
+            }
+            for source, fetched_at, lease_until in rows
+        ]
@@ -0,0 +1,176 @@
+"""
+Quote Source Client
+Shared HTTP client for the remote quote APIs
+"""
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import metrics
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 5)
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Circuit breaker: skip a source after this many consecutive failures...
+DEFAULT_FAILURE_THRESHOLD = 3
+# ...for this many seconds
+DEFAULT_COOLDOWN_SECONDS = 60
+
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker
+
+    Opens after a run of consecutive failures and rejects calls until the
+    cooldown has passed; then one trial call is let through, and its
+    outcome either closes the breaker or opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state: closed, open or half_open"""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown_seconds:
+            return "open"
+        return "half_open"
+
+    def allow_request(self) -> bool:
+        """Check whether a call to the source may go ahead"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class QuoteSourceClient:
+    """
+    Pooled HTTP client with timeouts, retries and a circuit breaker per source
+
+    Keeps request, error, rejection and latency counters per source.
+    """
+
+    def __init__(
+        self,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+    ):
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.session = requests.Session()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=10)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._breakers = {}  # {source: CircuitBreaker}
+        self._stats = {}     # {source: {counter: value}}
+        self._lock = threading.Lock()
+
+    def get_breaker(self, source: str) -> CircuitBreaker:
+        """Get the circuit breaker for a source"""
+        with self._lock:
+            breaker = self._breakers.get(source)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.cooldown_seconds)
+                self._breakers[source] = breaker
+                self._stats[source] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "rejected": 0,
+                    "latency_seconds_total": 0.0,
+                    "last_latency_seconds": 0.0,
+                }
+            return breaker
+
+    def get_json(self, source: str, url: str) -> Optional[Any]:
+        """
+        Fetch and decode JSON from a source
+
+        Returns:
+            The decoded JSON, or None if the source failed or its circuit is open
+        """
+        breaker = self.get_breaker(source)
+        stats = self._stats[source]
+
+        if not breaker.allow_request():
+            with self._lock:
+                stats["rejected"] += 1
+            metrics.inc("autoquoter_upstream_rejected_total", source=source)
+            return None
+
+        start_time = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self._record(source, stats, start_time, error=True)
+            metrics.inc("autoquoter_upstream_errors_total", source=source)
+            breaker.record_failure()
+            print(f"Error fetching from {source}: {e}")
+            return None
+
+        self._record(source, stats, start_time, error=False)
+        breaker.record_success()
+        return data
+
+    def _record(self, source: str, stats: Dict[str, Any], start_time: float, error: bool) -> None:
+        """Update a source's counters after a call"""
+        latency = time.perf_counter() - start_time
+        metrics.observe("autoquoter_upstream_seconds", latency, source=source)
+        with self._lock:
+            stats["requests"] += 1
+            stats["latency_seconds_total"] += latency
+            stats["last_latency_seconds"] = latency
+            if error:
+                stats["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get a snapshot of per-source counters and breaker states"""
+        with self._lock:
+            return {
+                source: dict(stats, circuit=self._breakers[source].state)
+                for source, stats in self._stats.items()
+            }
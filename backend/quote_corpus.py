@@ -0,0 +1,93 @@
+"""
+Quote Corpus Module
+Local quote collection with a prebuilt per-theme index
+"""
+import json
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Any
+
+
+class QuoteCorpus:
+    """
+    In-memory quote collection indexed by theme
+
+    Quotes are indexed once when added: by their explicit "themes" tags and
+    by every theme keyword their text contains. Picking a quote for a theme
+    is then a single random choice from that theme's ID list.
+    """
+
+    def __init__(self, theme_keywords: Dict[str, List[str]]):
+        self.theme_keywords = theme_keywords
+        self.quotes = {}          # {quote_id: {"id", "text", "author", "themes"}}
+        self.keyword_index = {}   # {keyword: [quote_id, ...]}
+        self.theme_index = {}     # {theme: [quote_id, ...]}
+        self._seen_texts = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, theme_keywords: Dict[str, List[str]]) -> "QuoteCorpus":
+        """Load a corpus from a JSON file of quotes"""
+        corpus = cls(theme_keywords)
+        with open(path, encoding="utf-8") as f:
+            corpus.add_quotes(json.load(f))
+        return corpus
+
+    def __len__(self) -> int:
+        return len(self.quotes)
+
+    def add_quotes(self, quotes: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add quotes to the corpus, skipping empty and duplicate texts
+
+        Returns:
+            Number of quotes added
+        """
+        added = 0
+        with self._lock:
+            for quote in quotes:
+                text = (quote.get("text") or "").strip()
+                normalized = " ".join(text.lower().split())
+                if not normalized or normalized in self._seen_texts:
+                    continue
+
+                quote_id = quote.get("id")
+                if quote_id is None or quote_id in self.quotes:
+                    quote_id = self._next_id
+                self._next_id = max(self._next_id, quote_id + 1)
+
+                self.quotes[quote_id] = {
+                    "id": quote_id,
+                    "text": text,
+                    "author": quote.get("author") or "Unknown",
+                    "themes": list(quote.get("themes", [])),
+                }
+                self._seen_texts.add(normalized)
+                self._index_quote(quote_id, normalized, quote.get("themes", []))
+                added += 1
+
+        return added
+
+    def _index_quote(self, quote_id: int, normalized_text: str, themes: Iterable[str]) -> None:
+        """Add a quote to the keyword and theme indexes"""
+        matched_themes = set(themes)
+
+        for theme, keywords in self.theme_keywords.items():
+            for keyword in keywords:
+                if keyword in normalized_text:
+                    self.keyword_index.setdefault(keyword, []).append(quote_id)
+                    matched_themes.add(theme)
+
+        for theme in matched_themes:
+            self.theme_index.setdefault(theme, []).append(quote_id)
+
+    def random_quote(self, theme: str, fallback_theme: str = "motivation") -> Optional[Dict[str, Any]]:
+        """Pick a random quote for a theme (or the fallback theme if it has none)"""
+        quote_ids = self.theme_index.get(theme.lower()) or self.theme_index.get(fallback_theme)
+        if not quote_ids:
+            if not self.quotes:
+                return None
+            quote_ids = list(self.quotes)
+
+        return self.quotes[random.choice(quote_ids)]
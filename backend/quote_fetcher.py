@@ -2,11 +2,18 @@
 Quote Fetcher Module
 Fetches quotes from various APIs based on themes
 """
-import requests
 import random
 import json
 import os
-from typing import Dict, List, Any
+import threading
+import time
+from typing import Dict, List, Any, Optional
+from metrics import metrics
+from quote_aggregator import QuoteAggregator
+from quote_cache import QuoteCache
+from quote_client import QuoteSourceClient
+from quote_corpus import QuoteCorpus
+from quote_prefetch import QuotePrefetcher
 
 # API endpoints
 APIS = {
@@ -15,8 +22,21 @@ APIS = {
     "stoic": "https://stoic-api.herokuapp.com/api/quote",
 }
 
-# Cache quotes to reduce API calls
-QUOTE_CACHE = {}
+# Pooled client shared by all quote sources
+quote_client = QuoteSourceClient()
+
+# Local quote corpus shipped with the app
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'quotes.json')
+CORPUS_REFRESH_INTERVAL_SECONDS = 6 * 3600
+
+# Remote API responses cached on disk and shared by all workers: fresh for
+# a per-source TTL, then served stale while one worker refreshes them
+QUOTE_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'quote_cache.sqlite3')
+QUOTE_CACHE_TTL_SECONDS = {
+    "type_fit": 24 * 3600,
+}
+quote_cache = QuoteCache(QUOTE_CACHE_PATH, QUOTE_CACHE_TTL_SECONDS)
+
 THEME_KEYWORDS = {
     "motivation": ["motivation", "inspire", "dream", "success", "goal", "action"],
     "stoicism": ["stoic", "virtue", "calm", "acceptance", "adversity", "obstacle"],
@@ -25,61 +45,198 @@ THEME_KEYWORDS = {
     "happiness": ["happy", "joy", "content", "smile", "peace", "pleasure", "delight"],
 }
 
+# Remote sources raced for a live quote, in order of preference
+LIVE_SOURCES = {
+    "stoicism": ["stoic", "zenquotes"],
+}
+LIVE_DEFAULT_SOURCES = ["zenquotes"]
+# Sources whose quotes always suit a theme; quotes from other sources
+# must mention one of the theme's keywords
+THEMED_SOURCES = {
+    "stoic": ["stoicism"],
+}
+LIVE_QUOTE_DEADLINE_SECONDS = 1.5
+
+# Sources the prefetcher tries, in order, to refill each theme's buffer
+# (any of: "corpus", "live", "zenquotes", "stoic")
+PREFETCH_SOURCES = {
+    "stoicism": ["live", "corpus"],
+}
+PREFETCH_DEFAULT_SOURCES = ["corpus"]
+
+_corpus = None
+_corpus_lock = threading.Lock()
+_prefetcher = None
+
+
+def is_themed_quote(theme: str, source: str, quote: Dict[str, str]) -> bool:
+    """Check that a remote quote has text and suits the theme"""
+    text = (quote.get("text") or "").lower()
+    if not text:
+        return False
+    if theme in THEMED_SOURCES.get(source, []):
+        return True
+    
+    keywords = THEME_KEYWORDS.get(theme)
+    return not keywords or any(keyword in text for keyword in keywords)
+
+
+# Races the remote APIs for live quotes
+quote_aggregator = QuoteAggregator(
+    sources={
+        "zenquotes": lambda theme: get_zen_quote(),
+        "stoic": lambda theme: fetch_stoic_quote(),
+    },
+    is_valid=is_themed_quote,
+    deadline_seconds=LIVE_QUOTE_DEADLINE_SECONDS,
+)
+
 
 def get_quote_by_theme(theme: str) -> Dict[str, str]:
     """
-    Fetch a quote based on the requested theme
+    Get a quote for the requested theme
+    Serves a prefetched quote when one is ready, otherwise picks from the local
+    corpus; if the corpus has nothing, races the remote APIs until the deadline
     Returns a dict with 'text' and 'author' keys
     """
-    # Prioritize ZenQuotes API as the primary source
-    quote = get_zen_quote()
-    
-    # If ZenQuotes fails or we need a specific theme
-    if not quote or (theme.lower() == "stoicism"):
-        # For stoicism theme, use dedicated stoic API
-        if theme.lower() == "stoicism":
-            return get_stoic_quote()
-            
-        # Try to fetch from Type.fit which has a large collection
-        quotes = get_typeit_quotes()
-        
-        # Filter quotes by theme
-        theme_keywords = THEME_KEYWORDS.get(theme.lower(), ["inspire", "motivation"])
-        matching_quotes = []
-        
-        for q in quotes:
-            quote_text = q.get("text", "").lower()
-            for keyword in theme_keywords:
-                if keyword in quote_text:
-                    matching_quotes.append(q)
-                    break
-        
-        # If we have matching quotes, return a random one
-        if matching_quotes:
-            chosen_quote = random.choice(matching_quotes)
-            return {
-                "text": chosen_quote.get("text", ""),
-                "author": chosen_quote.get("author", "Unknown")
-            }
-    
-    # Return ZenQuotes result or fallback
-    return quote
+    if _prefetcher is not None:
+        with metrics.timer("quote_prefetch"):
+            quote = _prefetcher.pop(theme)
+        if quote:
+            metrics.inc("autoquoter_quotes_served_total", source="prefetch")
+            return quote
+    
+    with metrics.timer("quote_corpus"):
+        quote = get_corpus_quote(theme)
+    if quote:
+        metrics.inc("autoquoter_quotes_served_total", source="corpus")
+        return quote
+    
+    with metrics.timer("quote_live"):
+        quote = fetch_live_quote(theme)
+    if quote:
+        metrics.inc("autoquoter_quotes_served_total", source="live")
+        return quote
+    
+    metrics.inc("autoquoter_quotes_served_total", source="default")
+    return get_default_quote()
+
+
+def fetch_live_quote(theme: str, deadline_seconds: Optional[float] = None) -> Optional[Dict[str, str]]:
+    """
+    Race the theme's remote sources for a quote
+    
+    Returns:
+        The first themed quote, or None if none arrived before the deadline
+    """
+    source_names = LIVE_SOURCES.get(theme.lower(), LIVE_DEFAULT_SOURCES)
+    return quote_aggregator.fetch(theme.lower(), source_names, deadline_seconds)
+
+
+def get_corpus_quote(theme: str) -> Optional[Dict[str, str]]:
+    """Pick a random quote for a theme from the local corpus"""
+    quote = get_corpus().random_quote(theme)
+    if not quote:
+        return None
+    
+    return {
+        "text": quote["text"],
+        "author": quote["author"]
+    }
+
+
+def get_corpus() -> QuoteCorpus:
+    """Get the quote corpus, loading and indexing it on first use"""
+    global _corpus
+    
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                try:
+                    _corpus = QuoteCorpus.load(CORPUS_PATH, THEME_KEYWORDS)
+                except Exception as e:
+                    print(f"Error loading quote corpus: {e}")
+                    _corpus = QuoteCorpus(THEME_KEYWORDS)
+    
+    return _corpus
+
+
+def refresh_corpus() -> int:
+    """
+    Pull new quotes from the remote APIs into the local corpus
+    
+    Returns:
+        Number of quotes added
+    """
+    corpus = get_corpus()
+    added = corpus.add_quotes(get_typeit_quotes())
+    
+    zen_quote = get_zen_quote()
+    if zen_quote:
+        added += corpus.add_quotes([zen_quote])
+    
+    stoic_quote = get_stoic_quote()
+    added += corpus.add_quotes([dict(stoic_quote, themes=["stoicism"])])
+    
+    return added
+
+
+def start_corpus_refresh(interval_seconds: int = CORPUS_REFRESH_INTERVAL_SECONDS) -> threading.Thread:
+    """Periodically refresh the corpus from remote APIs in a daemon thread"""
+    def refresh_loop():
+        while True:
+            try:
+                added = refresh_corpus()
+                print(f"Quote corpus refreshed: {added} new quotes, {len(get_corpus())} total")
+            except Exception as e:
+                print(f"Error refreshing quote corpus: {e}")
+            time.sleep(interval_seconds)
+    
+    thread = threading.Thread(target=refresh_loop, name="corpus-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_quote_prefetcher(depth: int, low_water: int, refill_rate: float) -> QuotePrefetcher:
+    """Start the background prefetcher that keeps quotes ready per theme"""
+    global _prefetcher
+    
+    source_functions = {
+        "corpus": get_corpus_quote,
+        "live": fetch_live_quote,
+        "zenquotes": lambda theme: get_zen_quote(),
+        "stoic": lambda theme: fetch_stoic_quote(),
+    }
+    
+    _prefetcher = QuotePrefetcher(
+        themes=list(THEME_KEYWORDS),
+        sources={
+            theme: [source_functions[name] for name in names]
+            for theme, names in PREFETCH_SOURCES.items()
+        },
+        default_sources=[source_functions[name] for name in PREFETCH_DEFAULT_SOURCES],
+        depth=depth,
+        low_water=low_water,
+        refill_rate=refill_rate,
+    )
+    _prefetcher.start()
+    return _prefetcher
+
+
+def get_prefetch_metrics() -> Optional[Dict[str, Any]]:
+    """Get the prefetcher's queue metrics, or None if it is not running"""
+    return _prefetcher.get_metrics() if _prefetcher is not None else None
 
 
 def get_zen_quote() -> Dict[str, str]:
     """Fetch a quote from ZenQuotes API"""
-    try:
-        response = requests.get(APIS["zenquotes"])
-        if response.status_code == 200:
-            data = response.json()
-            if data and len(data) > 0:
-                quote = data[0]
-                return {
-                    "text": quote.get("q", ""),
-                    "author": quote.get("a", "Unknown")
-                }
-    except Exception as e:
-        print(f"Error fetching from ZenQuotes: {e}")
+    data = quote_client.get_json("zenquotes", APIS["zenquotes"])
+    if data and isinstance(data, list):
+        quote = data[0]
+        return {
+            "text": quote.get("q", ""),
+            "author": quote.get("a", "Unknown")
+        }
     
     # Return None to indicate failure
     return None
@@ -87,16 +244,9 @@ def get_zen_quote() -> Dict[str, str]:
 
 def get_stoic_quote() -> Dict[str, str]:
     """Fetch a stoic quote"""
-    try:
-        response = requests.get(APIS["stoic"])
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "text": data.get("quote", ""),
-                "author": data.get("author", "Unknown")
-            }
-    except Exception as e:
-        print(f"Error fetching from Stoic API: {e}")
+    quote = fetch_stoic_quote()
+    if quote:
+        return quote
     
     # Fallback to a stoic-themed default quote
     return {
@@ -105,22 +255,22 @@ def get_stoic_quote() -> Dict[str, str]:
     }
 
 
+def fetch_stoic_quote() -> Optional[Dict[str, str]]:
+    """Fetch a quote from the Stoic API, returning None on failure"""
+    data = quote_client.get_json("stoic", APIS["stoic"])
+    if data and isinstance(data, dict) and data.get("quote"):
+        return {
+            "text": data.get("quote", ""),
+            "author": data.get("author", "Unknown")
+        }
+    return None
+
+
 def get_typeit_quotes() -> List[Dict[str, Any]]:
-    """Fetch quotes from Type.fit API with caching"""
-    global QUOTE_CACHE
-    
-    # Check cache first
-    if "type_fit" in QUOTE_CACHE:
-        return QUOTE_CACHE["type_fit"]
-    
-    try:
-        response = requests.get(APIS["type_fit"])
-        if response.status_code == 200:
-            quotes = response.json()
-            QUOTE_CACHE["type_fit"] = quotes
-            return quotes
-    except Exception as e:
-        print(f"Error fetching from Type.fit: {e}")
+    """Get the Type.fit quote list from the shared quote cache"""
+    quotes = quote_cache.get("type_fit", fetch_typeit_quotes)
+    if quotes:
+        return quotes
     
     # Return a small default list if API fails
     return [
@@ -132,6 +282,14 @@ def get_typeit_quotes() -> List[Dict[str, Any]]:
     ]
 
 
+def fetch_typeit_quotes() -> Optional[List[Dict[str, Any]]]:
+    """Fetch the quote list from the Type.fit API, returning None on failure"""
+    quotes = quote_client.get_json("type_fit", APIS["type_fit"])
+    if quotes and isinstance(quotes, list):
+        return quotes
+    return None
+
+
 def get_default_quote() -> Dict[str, str]:
     """Return a default quote if all APIs fail"""
     default_quotes = [
@@ -0,0 +1,145 @@
+"""
+Quote Prefetch Module
+Keeps a buffer of ready-to-serve quotes per theme, refilled in the background
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Any
+
+# Default number of quotes buffered per theme
+DEFAULT_DEPTH = 20
+# Refill a theme when its buffer drops below this many quotes
+DEFAULT_LOW_WATER = 5
+# Maximum quotes fetched per second across all themes
+DEFAULT_REFILL_RATE = 2.0
+
+QuoteSource = Callable[[str], Optional[Dict[str, str]]]
+
+
+class QuotePrefetcher:
+    """
+    Background prefetcher with a bounded deque of quotes per theme
+
+    The request path only pops from a deque. A daemon thread tops up any
+    theme that dropped below the low-water mark, trying that theme's
+    sources in order and pacing fetches to the refill rate.
+    """
+
+    def __init__(
+        self,
+        themes: List[str],
+        sources: Dict[str, List[QuoteSource]],
+        default_sources: List[QuoteSource],
+        depth: int = DEFAULT_DEPTH,
+        low_water: int = DEFAULT_LOW_WATER,
+        refill_rate: float = DEFAULT_REFILL_RATE,
+    ):
+        self.themes = list(themes)
+        self.sources = sources
+        self.default_sources = default_sources
+        self.depth = depth
+        self.low_water = low_water
+        self.refill_rate = refill_rate
+
+        self.buffers = {theme: deque(maxlen=depth) for theme in self.themes}
+        self.counters = {theme: {"served": 0, "empty": 0, "refilled": 0} for theme in self.themes}
+        self._counter_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> threading.Thread:
+        """Start the refill thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="quote-prefetch", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stop the refill thread"""
+        self._stop.set()
+        self._wake.set()
+
+    def pop(self, theme: str) -> Optional[Dict[str, str]]:
+        """Take a buffered quote for a theme, or None if none is ready"""
+        buffer = self.buffers.get(theme.lower())
+        if buffer is None:
+            return None
+
+        counters = self.counters[theme.lower()]
+        try:
+            quote = buffer.popleft()
+        except IndexError:
+            with self._counter_lock:
+                counters["empty"] += 1
+            self._wake.set()
+            return None
+
+        with self._counter_lock:
+            counters["served"] += 1
+        if len(buffer) < self.low_water:
+            self._wake.set()
+        return quote
+
+    def refill(self, theme: str) -> int:
+        """
+        Fill a theme's buffer up to the configured depth
+
+        Returns:
+            Number of quotes added
+        """
+        buffer = self.buffers[theme]
+        delay = 1.0 / self.refill_rate if self.refill_rate > 0 else 0
+        added = 0
+
+        while len(buffer) < self.depth and not self._stop.is_set():
+            quote = self._fetch(theme)
+            if quote is None:
+                break
+
+            buffer.append(quote)
+            with self._counter_lock:
+                self.counters[theme]["refilled"] += 1
+            added += 1
+
+            if delay:
+                self._stop.wait(delay)
+
+        return added
+
+    def _fetch(self, theme: str) -> Optional[Dict[str, str]]:
+        """Get one quote for a theme from the first source that has one"""
+        for source in self.sources.get(theme, self.default_sources):
+            try:
+                quote = source(theme)
+            except Exception as e:
+                print(f"Error prefetching {theme} quote: {e}")
+                continue
+            if quote and quote.get("text"):
+                return quote
+        return None
+
+    def _run(self) -> None:
+        """Refill loop: top up low themes, then sleep until woken"""
+        while not self._stop.is_set():
+            self._wake.clear()
+            for theme in self.themes:
+                if len(self.buffers[theme]) < self.low_water:
+                    self.refill(theme)
+            self._wake.wait(timeout=60)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get buffer levels, counters and configuration"""
+        with self._counter_lock:
+            counters = {theme: dict(self.counters[theme]) for theme in self.themes}
+        return {
+            "depth": self.depth,
+            "lowWater": self.low_water,
+            "refillRate": self.refill_rate,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "themes": {
+                theme: dict(counters[theme], buffered=len(self.buffers[theme]))
+                for theme in self.themes
+            },
+        }
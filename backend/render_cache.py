@@ -0,0 +1,114 @@
+"""
+Render Cache Module
+Content-addressed cache of rendered quote images
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+from metrics import metrics
+from storage import StorageBackend, make_object_name
+
+# Bump when rendering output changes so stale files on disk are not served
+RENDER_VERSION = 1
+
+# Default in-memory budget for cached images
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+def make_render_key(**render_inputs) -> str:
+    """
+    Build a cache key from every input that affects the rendered image
+
+    Returns:
+        Hex SHA-256 digest of the inputs
+    """
+    payload = json.dumps(
+        {"version": RENDER_VERSION, **render_inputs},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Two-tier cache of encoded images keyed by render hash
+
+    The memory tier is an LRU bounded by total bytes; the storage tier
+    holds one object per key named by the hash, so it survives restarts
+    and is shared by all workers.
+    """
+
+    def __init__(self, storage: StorageBackend, max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES, extension: str = "png"):
+        self.storage = storage
+        self.max_memory_bytes = max_memory_bytes
+        self.extension = extension
+        self._entries = OrderedDict()  # {key: bytes}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def name_for(self, key: str, extension: Optional[str] = None) -> str:
+        """Get the storage object name for a cache key"""
+        return make_object_name(extension or self.extension, key)
+
+    def get(self, key: str, extension: Optional[str] = None) -> Optional[bytes]:
+        """Get cached bytes for a key from memory, then storage"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if data is not None:
+            metrics.inc("autoquoter_cache_requests_total", cache="render", result="hit")
+            return data
+
+        data = self.storage.load(self.name_for(key, extension))
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            metrics.inc("autoquoter_cache_requests_total", cache="render", result="miss")
+            return None
+
+        self._remember(key, data)
+        with self._lock:
+            self.hits += 1
+        metrics.inc("autoquoter_cache_requests_total", cache="render", result="hit")
+        return data
+
+    def put(self, key: str, data: bytes, write_to_disk: bool = True, extension: Optional[str] = None) -> None:
+        """Store encoded bytes for a key in both tiers"""
+        if write_to_disk:
+            self.write(key, data, extension)
+
+        self._remember(key, data)
+
+    def write(self, key: str, data: bytes, extension: Optional[str] = None) -> str:
+        """
+        Write encoded bytes for a key to the storage tier only
+
+        Returns:
+            Name of the stored object
+        """
+        return self.storage.save(self.name_for(key, extension), data)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Add bytes to the memory tier, evicting least recently used entries"""
+        size = len(data)
+        if size > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+
+            self._entries[key] = data
+            self._memory_bytes += size
+
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted)
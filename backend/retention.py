@@ -0,0 +1,234 @@
+"""
+Retention Module
+Background sweeper that enforces age, count and size limits on stored images
+
+Can also be run once from the command line:
+    python backend/retention.py --max-age-hours 24 --max-files 1000
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import NamedTuple, Optional, Tuple
+from storage import LocalDiskStorage, StorageBackend
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock file, every process sweeps
+    fcntl = None
+
+# Default retention limits
+DEFAULT_MAX_AGE_HOURS = 24
+DEFAULT_MAX_FILES = 1000
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_INTERVAL_SECONDS = 300
+
+
+class SweepReport(NamedTuple):
+    """Outcome of one retention sweep"""
+    removed_files: int
+    reclaimed_bytes: int
+    kept_files: int
+    kept_bytes: int
+    duration: float
+    finished_at: float
+
+
+class RetentionSweeper:
+    """
+    Keeps a storage backend within its retention limits
+
+    An index of {name: (mtime, size)} is rebuilt by every sweep and
+    updated by record() as objects are written, so the totals are known
+    without listing the storage.
+
+    With a lock_path, the processes sharing it elect one sweeper: the
+    first to take the lock sweeps and publishes each report next to the
+    lock file. The others only read that report, and their totals are the
+    published ones plus the objects they recorded since.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+        max_files: int = DEFAULT_MAX_FILES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+        lock_path: Optional[str] = None,
+    ):
+        self.storage = storage
+        self.max_age_seconds = max_age_hours * 3600
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self.lock_path = lock_path
+        self.report_path = os.path.splitext(lock_path)[0] + ".json" if lock_path else None
+        self.last_report = None
+        self._index = {}  # {name: (mtime, size)}
+        self._published_totals = (0, 0)  # (files, bytes) from the elected sweeper's report
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, name: str, size: int) -> None:
+        """Add a newly written object to the index"""
+        with self._lock:
+            self._index[name] = (time.time(), size)
+
+    def totals(self) -> Tuple[int, int]:
+        """(file count, total bytes) according to the index"""
+        with self._lock:
+            files, total_bytes = self._published_totals
+            return files + len(self._index), total_bytes + sum(size for _, size in self._index.values())
+
+    def sweep(self) -> SweepReport:
+        """
+        Remove objects that are too old or beyond the count/byte budget
+
+        The storage is listed once (for local disk: one os.scandir walk,
+        one stat per file). The newest objects are kept first.
+        """
+        start_time = time.perf_counter()
+        sweep_started_at = time.time()
+        entries = [(obj.name, obj.mtime, obj.size) for obj in self.storage.list_objects()]
+        cutoff = sweep_started_at - self.max_age_seconds
+
+        # Newest first: keep files while they fit the budgets
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        kept = {}
+        kept_bytes = 0
+        to_remove = []
+
+        for name, mtime, size in entries:
+            if (mtime < cutoff
+                    or len(kept) >= self.max_files
+                    or kept_bytes + size > self.max_bytes):
+                to_remove.append((name, size))
+            else:
+                kept[name] = (mtime, size)
+                kept_bytes += size
+
+        removed_files = 0
+        reclaimed_bytes = 0
+        for name, size in to_remove:
+            try:
+                if self.storage.delete(name):
+                    removed_files += 1
+                    reclaimed_bytes += size
+            except Exception as e:
+                print(f"Failed to remove {name}: {e}")
+
+        with self._lock:
+            # Keep files recorded while the sweep was running
+            recorded = {name: info for name, info in self._index.items() if info[0] >= sweep_started_at}
+            self._index = kept
+            self._index.update(recorded)
+
+        report = SweepReport(removed_files, reclaimed_bytes, len(kept), kept_bytes,
+                             time.perf_counter() - start_time, time.time())
+        self.last_report = report
+        return report
+
+    def start(self) -> threading.Thread:
+        """Run sweeps periodically in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="retention-sweeper", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stop the periodic sweeps"""
+        self._stop.set()
+
+    def is_sweeper(self) -> bool:
+        """
+        Whether this process runs the sweeps
+
+        Always true without a lock_path. Otherwise the lock is taken
+        without blocking and held until the process exits, so another
+        process takes over the next time it checks if this one dies.
+        """
+        if self.lock_path is None or fcntl is None:
+            return True
+        if self._lock_file is None:
+            os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+            lock_file = open(self.lock_path, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._lock_file = lock_file
+            with self._lock:
+                self._published_totals = (0, 0)
+        return True
+
+    def _publish(self, report: SweepReport) -> None:
+        """Write a sweep report for the processes that do not sweep"""
+        if self.report_path is None:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.report_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(report._asdict(), f)
+            os.replace(temp_path, self.report_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def _follow(self) -> None:
+        """Pick up the elected sweeper's latest report and totals"""
+        try:
+            with open(self.report_path) as f:
+                report = SweepReport(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return
+
+        self.last_report = report
+        with self._lock:
+            # Objects recorded before the sweep started are counted in its totals
+            started_at = report.finished_at - report.duration
+            self._index = {name: info for name, info in self._index.items() if info[0] >= started_at}
+            self._published_totals = (report.kept_files, report.kept_bytes)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.is_sweeper():
+                    report = self.sweep()
+                    self._publish(report)
+                    if report.removed_files:
+                        print(f"Retention sweep removed {report.removed_files} files, "
+                              f"reclaimed {report.reclaimed_bytes} bytes")
+                else:
+                    self._follow()
+            except Exception as e:
+                print(f"Retention sweep failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+
+def main(argv: Optional[list] = None) -> SweepReport:
+    """Run a single sweep from the command line"""
+    default_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'generated')
+
+    parser = argparse.ArgumentParser(description="Remove old generated quote images")
+    parser.add_argument("--directory", default=default_directory)
+    parser.add_argument("--max-age-hours", type=float, default=DEFAULT_MAX_AGE_HOURS)
+    parser.add_argument("--max-files", type=int, default=DEFAULT_MAX_FILES)
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    args = parser.parse_args(argv)
+
+    sweeper = RetentionSweeper(LocalDiskStorage(args.directory), args.max_age_hours, args.max_files, args.max_bytes)
+    report = sweeper.sweep()
+    print(f"Removed {report.removed_files} files ({report.reclaimed_bytes} bytes); "
+          f"kept {report.kept_files} files ({report.kept_bytes} bytes)")
+    return report
+
+
+if __name__ == '__main__':
+    main()
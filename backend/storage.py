@@ -0,0 +1,164 @@
+"""
+Storage Module
+Collision-free, sharded storage for generated images
+"""
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable, Iterator, NamedTuple, Optional
+
+# Default sharding: two levels of two hex characters (256 * 256 directories)
+DEFAULT_SHARD_DEPTH = 2
+DEFAULT_SHARD_WIDTH = 2
+
+
+class StoredObject(NamedTuple):
+    """A stored file as seen by listing the backend"""
+    name: str
+    size: int
+    mtime: float
+
+
+def make_object_name(extension: str, key: Optional[str] = None) -> str:
+    """
+    Build a unique object name from a content hash, or a random UUID
+
+    Returns:
+        Name like "<hex>.<extension>"
+    """
+    return f"{key or uuid.uuid4().hex}.{extension}"
+
+
+def write_atomic(path: str, write: Callable[[BinaryIO], None]) -> None:
+    """
+    Write a file through a temporary file in the same directory, then rename it into place
+
+    Readers never see a partial file, and the temporary file is removed
+    if writing fails.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class StorageBackend(ABC):
+    """
+    Interface for generated image storage
+
+    Objects are addressed by flat names (see make_object_name); how they
+    are laid out is up to the backend. An object-store backend can map
+    names straight to object keys.
+    """
+
+    @abstractmethod
+    def save(self, name: str, data: bytes) -> str:
+        """Store bytes under a name atomically and return the name"""
+
+    @abstractmethod
+    def load(self, name: str) -> Optional[bytes]:
+        """Get the bytes stored under a name, or None if it does not exist"""
+
+    @abstractmethod
+    def delete(self, name: str) -> bool:
+        """Delete an object; False if it did not exist"""
+
+    @abstractmethod
+    def url_for(self, name: str) -> str:
+        """Public URL of an object"""
+
+    @abstractmethod
+    def list_objects(self) -> Iterator[StoredObject]:
+        """Iterate over every stored object"""
+
+
+class LocalDiskStorage(StorageBackend):
+    """
+    Stores objects on local disk, sharded by the leading characters of the name
+
+    "3fa9c1...png" is stored at <root>/3f/a9/3fa9c1...png. Writes go to a
+    temporary file in the same directory and are renamed into place, so
+    readers never see a partial file.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        url_prefix: str = "",
+        shard_depth: int = DEFAULT_SHARD_DEPTH,
+        shard_width: int = DEFAULT_SHARD_WIDTH,
+    ):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+        os.makedirs(root, exist_ok=True)
+
+    def _shards(self, name: str) -> list:
+        """Subdirectory names an object is sharded into"""
+        return [
+            name[level * self.shard_width:(level + 1) * self.shard_width]
+            for level in range(self.shard_depth)
+        ]
+
+    def path_for(self, name: str) -> str:
+        """On-disk path of an object"""
+        if os.path.basename(name) != name or name.startswith("."):
+            raise ValueError(f"Invalid object name: {name}")
+        return os.path.join(self.root, *self._shards(name), name)
+
+    def save(self, name: str, data: bytes) -> str:
+        write_atomic(self.path_for(name), lambda f: f.write(data))
+        return name
+
+    def load(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self.path_for(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, name: str) -> bool:
+        # Also covers files left in the root by the old flat layout
+        for path in (self.path_for(name), os.path.join(self.root, name)):
+            try:
+                os.remove(path)
+                return True
+            except FileNotFoundError:
+                continue
+        return False
+
+    def url_for(self, name: str) -> str:
+        return "/".join([self.url_prefix, *self._shards(name), name])
+
+    def list_objects(self) -> Iterator[StoredObject]:
+        """Walk the shard tree with os.scandir, stat'ing each file once"""
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        # Skip in-progress temporary files
+                        if entry.name.startswith("."):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                yield StoredObject(entry.name, stat.st_size, stat.st_mtime)
+                        except FileNotFoundError:
+                            continue
+            except FileNotFoundError:
+                continue
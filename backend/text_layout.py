@@ -0,0 +1,224 @@
+"""
+Text Layout Module
+Measure-once word wrapping and line positioning for quote images
+"""
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, NamedTuple, Tuple
+from PIL import ImageFont
+
+# Upper bound on cached word widths per font (custom quotes are unbounded)
+MAX_CACHED_WORDS = 10000
+
+# Hard limits for fit_text, so hostile input cannot pin a worker
+MAX_FIT_TEXT_LENGTH = 2000   # Characters
+MAX_FIT_SECONDS = 0.05       # Search time before settling for the best size found
+
+# Per-font cache of word advance widths
+# {font: {word: width}}
+_WORD_WIDTHS = weakref.WeakKeyDictionary()
+_WIDTHS_LOCK = threading.Lock()
+
+
+class LineBox(NamedTuple):
+    """A laid-out line of text, positioned relative to the block top"""
+    text: str
+    x: int
+    y: int
+    width: float
+    height: int
+
+
+class TextBlock(NamedTuple):
+    """A block of wrapped lines ready to be drawn"""
+    lines: List[LineBox]
+    width: float
+    height: int
+
+
+def _get_width_cache(font: ImageFont.FreeTypeFont) -> Dict[str, float]:
+    """Get the word width cache for a font, creating it if needed"""
+    widths = _WORD_WIDTHS.get(font)
+    if widths is None:
+        with _WIDTHS_LOCK:
+            widths = _WORD_WIDTHS.get(font)
+            if widths is None:
+                widths = {}
+                _WORD_WIDTHS[font] = widths
+    return widths
+
+
+def measure_word(font: ImageFont.FreeTypeFont, word: str) -> float:
+    """Get the advance width of a word, measuring it only once per font"""
+    widths = _get_width_cache(font)
+    width = widths.get(word)
+    if width is None:
+        if len(widths) >= MAX_CACHED_WORDS:
+            widths.clear()
+        width = font.getlength(word)
+        widths[word] = width
+    return width
+
+
+def get_line_height(font: ImageFont.FreeTypeFont) -> int:
+    """Get the height of a single line of text for a font"""
+    if hasattr(font, "getmetrics"):
+        ascent, descent = font.getmetrics()
+        return ascent + descent
+    return font.getbbox("Ag")[3]
+
+
+def break_lines(word_widths: List[float], space_width: float, max_width: float) -> List[Tuple[int, int, float]]:
+    """
+    Greedily break a sequence of word widths into lines no wider than max_width
+
+    A word wider than max_width gets a line of its own.
+
+    Returns:
+        List of (first_word_index, end_word_index, line_width) tuples
+    """
+    lines = []
+    start = 0
+    current_width = 0.0
+
+    for index, word_width in enumerate(word_widths):
+        test_width = current_width + space_width + word_width if index > start else word_width
+
+        if test_width <= max_width or index == start:
+            # Word fits (or starts a new line on its own)
+            current_width = test_width
+        else:
+            # Word doesn't fit, start a new line
+            lines.append((start, index, current_width))
+            start = index
+            current_width = word_width
+
+    # Add the last line
+    if start < len(word_widths):
+        lines.append((start, len(word_widths), current_width))
+
+    return lines
+
+
+def wrap_words(text: str, font: ImageFont.FreeTypeFont, max_width: float) -> List[Tuple[str, float]]:
+    """
+    Wrap text to fit within max_width by summing cached word widths
+
+    Returns:
+        List of (line_text, line_width) tuples
+    """
+    words = text.split()
+    word_widths = [measure_word(font, word) for word in words]
+    return [
+        (' '.join(words[start:end]), line_width)
+        for start, end, line_width in break_lines(word_widths, measure_word(font, " "), max_width)
+    ]
+
+
+def layout_text(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    max_width: float,
+    canvas_width: int,
+    line_spacing: int = 10
+) -> TextBlock:
+    """
+    Wrap and position text centered horizontally on a canvas
+
+    Args:
+        text: The text to lay out
+        font: Font used to measure and draw the text
+        max_width: Maximum width of a line
+        canvas_width: Width of the canvas the lines are centered on
+        line_spacing: Extra space between lines
+
+    Returns:
+        TextBlock whose line boxes carry precomputed x/y positions
+    """
+    line_height = get_line_height(font)
+    lines = []
+    block_width = 0.0
+    y = 0
+
+    for line_text, line_width in wrap_words(text, font, max_width):
+        x = int((canvas_width - line_width) // 2)
+        lines.append(LineBox(line_text, x, y, line_width, line_height))
+        block_width = max(block_width, line_width)
+        y += line_height + line_spacing
+
+    block_height = y - line_spacing if lines else 0
+    return TextBlock(lines, block_width, block_height)
+
+
+def fit_text(
+    text: str,
+    get_font_at: Callable[[int], ImageFont.FreeTypeFont],
+    min_size: int,
+    max_size: int,
+    max_width: float,
+    max_height: float,
+    canvas_width: int,
+    line_spacing: int = 10,
+    time_limit: float = MAX_FIT_SECONDS
+) -> Tuple[ImageFont.FreeTypeFont, TextBlock]:
+    """
+    Lay out text at the largest font size whose wrapped block fits a box
+
+    Words are measured once, at max_size. Glyph advances scale about
+    linearly with size, so a probe at size s wraps those widths against
+    the box scaled by max_size / s: a sum per word, no re-measuring. The
+    size found is then laid out with real measurements and stepped down
+    if the scaled estimate was slightly optimistic.
+
+    Args:
+        text: The text to lay out
+        get_font_at: Returns the font at a given size
+        min_size: Smallest font size allowed (used even if the text does not fit)
+        max_size: Largest font size allowed
+        max_width: Maximum width of a line
+        max_height: Maximum height of the block
+        canvas_width: Width of the canvas the lines are centered on
+        line_spacing: Extra space between lines
+        time_limit: Seconds after which the best size found so far is used
+
+    Returns:
+        (font, TextBlock) for the chosen size
+
+    Raises:
+        ValueError: If the text is longer than MAX_FIT_TEXT_LENGTH
+    """
+    if len(text) > MAX_FIT_TEXT_LENGTH:
+        raise ValueError(f"Text is too long to fit ({len(text)} > {MAX_FIT_TEXT_LENGTH} characters)")
+
+    deadline = time.perf_counter() + time_limit
+    reference = get_font_at(max_size)
+    word_widths = [measure_word(reference, word) for word in text.split()]
+    space_width = measure_word(reference, " ")
+    line_height = get_line_height(reference)
+
+    def estimate_fits(size: int) -> bool:
+        scale = size / max_size
+        lines = break_lines(word_widths, space_width, max_width / scale)
+        widest = max((line_width for _, _, line_width in lines), default=0.0)
+        height = len(lines) * line_height * scale + (len(lines) - 1) * line_spacing
+        return widest * scale <= max_width and height <= max_height
+
+    # Largest size estimated to fit; min_size is the floor either way
+    low, high = min_size, max_size
+    while low < high and time.perf_counter() < deadline:
+        middle = (low + high + 1) // 2
+        if estimate_fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+
+    # Confirm with real measurements, stepping down while it overflows
+    size = low
+    while True:
+        font = get_font_at(size)
+        block = layout_text(text, font, max_width, canvas_width, line_spacing)
+        fits = block.width <= max_width and block.height <= max_height
+        if fits or size <= min_size or time.perf_counter() >= deadline:
+            return font, block
+        size -= 1
@@ -2,9 +2,11 @@
 Utility Functions for AutoQuoter
 """
 import os
-import time
+import sys
 import glob
 from typing import List
+from retention import RetentionSweeper
+from storage import LocalDiskStorage
 
 def cleanup_old_files(directory: str, max_age_hours: int = 24, max_files: int = 100) -> None:
     """
@@ -18,35 +20,9 @@ def cleanup_old_files(directory: str, max_age_hours: int = 24, max_files: int =
     if not os.path.exists(directory):
         return
     
-    # Get all files in the directory
-    files = glob.glob(os.path.join(directory, "*.*"))
-    
-    # Sort files by modification time (oldest first)
-    files.sort(key=lambda x: os.path.getmtime(x))
-    
-    # Remove old files based on count
-    if len(files) > max_files:
-        files_to_remove = files[:-max_files]  # Keep the newest 'max_files' files
-        for file_path in files_to_remove:
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                print(f"Failed to remove {file_path}: {e}")
-        
-        # After removing based on count, return early
-        return
-    
-    # Remove files older than max_age_hours
-    current_time = time.time()
-    max_age_seconds = max_age_hours * 3600
-    
-    for file_path in files:
-        file_modified_time = os.path.getmtime(file_path)
-        if current_time - file_modified_time > max_age_seconds:
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                print(f"Failed to remove {file_path}: {e}")
+    # Single scandir pass that enforces both limits
+    storage = LocalDiskStorage(directory)
+    RetentionSweeper(storage, max_age_hours=max_age_hours, max_files=max_files, max_bytes=sys.maxsize).sweep()
 
 
 def ensure_directories_exist() -> None:
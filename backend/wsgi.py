@@ -0,0 +1,13 @@
+"""
+WSGI Entry Point
+Production entry for gunicorn (see gunicorn.conf.py in the project root)
+"""
+import gc
+from main import app, preload_assets
+
+# With preload_app this runs once in the gunicorn master
+preload_assets()
+
+# Keep the preloaded objects out of garbage collection passes, so workers
+# do not touch (and copy) the pages they share with the master
+gc.freeze()
@@ -0,0 +1,43 @@
+"""
+Zip Stream Module
+Builds ZIP archives incrementally so responses can stream them entry by entry
+"""
+import io
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that hands back what was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive of (name, data) entries
+
+    Each entry's bytes are yielded as soon as it is added, so only one
+    entry is held at a time. Images are already compressed, so entries
+    are stored as-is.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,112 @@
+"""
+API Load Benchmark
+Load-tests /api/generate through Flask's test client with network quote sources stubbed out
+
+Usage:
+    python benchmarks/bench_api.py [--requests 200] [--concurrency 4]
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from common import QUOTES, peak_rss_kb, summarize
+
+# Canned responses for each remote quote source
+STUB_RESPONSES = {
+    "zenquotes": [{"q": QUOTES["medium"], "a": "Stub Author"}],
+    "stoic": {"quote": QUOTES["short"], "author": "Stub Stoic"},
+    "type_fit": [{"text": QUOTES["long"], "author": "Stub Author"}],
+}
+
+
+class StubQuoteClient:
+    """Stands in for QuoteSourceClient so no request leaves the process"""
+
+    def get_json(self, source: str, url: str) -> Optional[Any]:
+        return STUB_RESPONSES.get(source)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+
+def make_payloads(themes, formats):
+    """Cycle through themes, formats and quote sources (corpus or custom text)"""
+    custom_quotes = [None, *QUOTES.values()]
+    for index, (theme, output_format, custom_quote) in enumerate(
+            itertools.cycle(itertools.product(themes, formats, custom_quotes))):
+        payload = {"theme": theme, "format": output_format}
+        if custom_quote:
+            # Vary the text so only some requests are render cache hits
+            payload["customQuote"] = f"{custom_quote} #{index % 50}"
+        yield payload
+
+
+def run(requests: int = 200, concurrency: int = 4) -> Dict[str, Any]:
+    """
+    Send requests to /api/generate from concurrent threads
+
+    Quotas are lifted and disk persistence is turned off so the numbers
+    cover only quote selection, rendering and the render cache.
+    """
+    import main
+    import quote_fetcher
+    from image_creator import OUTPUT_FORMATS, THEME_BACKGROUNDS
+    from quota import MemoryQuotaStore
+
+    quote_fetcher.quote_client = StubQuoteClient()
+    main.quota_store = MemoryQuotaStore(requests + 1, 86400)
+    main.PERSIST_GENERATED = False
+
+    payloads = make_payloads(list(THEME_BACKGROUNDS), list(OUTPUT_FORMATS))
+    payloads = [next(payloads) for _ in range(requests)]
+
+    local = threading.local()
+    statuses = {}
+    status_lock = threading.Lock()
+    hits_before, misses_before = main.render_cache.hits, main.render_cache.misses
+
+    def send(payload):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = main.app.test_client()
+        start_time = time.perf_counter()
+        response = client.post('/api/generate', json=payload)
+        duration = time.perf_counter() - start_time
+        with status_lock:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return duration
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(send, payloads))
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency": summarize(durations),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "cache_hits": main.render_cache.hits - hits_before,
+        "cache_misses": main.render_cache.misses - misses_before,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test /api/generate in process")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    results = run(args.requests, args.concurrency)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Background Pre-processing Benchmark
+Compares the fused blur-and-darken path with the previous RGBA composite path
+
+Usage:
+    python benchmarks/bench_background.py [--iterations 50] [--size 1080x1080]
+"""
+import argparse
+import os
+import time
+
+from common import BACKEND_DIR  # noqa: F401 (puts the backend on sys.path)
+
+from PIL import Image, ImageFilter
+from image_creator import (
+    BACKGROUND_BLUR_RADIUS, BACKGROUND_DARKEN_FACTOR, BACKGROUNDS_DIR,
+    create_default_background, parse_size, prepare_background
+)
+
+
+def legacy_prepare_background(img, size):
+    """The pre-processing path before it was fused, kept for comparison"""
+    img = img.convert('RGB').resize(size)
+    img = img.filter(ImageFilter.GaussianBlur(radius=BACKGROUND_BLUR_RADIUS))
+
+    darkened = img.copy()
+    overlay = Image.new('RGBA', img.size, (0, 0, 0, int(255 * (1 - BACKGROUND_DARKEN_FACTOR))))
+    if darkened.mode == 'RGB':
+        darkened = darkened.convert('RGBA')
+    darkened = Image.alpha_composite(darkened.convert('RGBA'), overlay)
+    return darkened.convert('RGB')
+
+
+class FrameCounter:
+    """Counts the images Pillow allocates (every new frame goes through Image._new)"""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self._original = Image.Image._new
+
+    def __enter__(self):
+        counter = self
+        original = self._original
+
+        def counting_new(image, im):
+            new = original(image, im)
+            counter.frames += 1
+            counter.bytes += new.width * new.height * len(new.getbands())
+            return new
+
+        Image.Image._new = counting_new
+        return self
+
+    def __exit__(self, *exc):
+        Image.Image._new = self._original
+
+
+def load_source():
+    """First background from BACKGROUNDS_DIR, or the default gradient"""
+    if os.path.exists(BACKGROUNDS_DIR):
+        for file_name in sorted(os.listdir(BACKGROUNDS_DIR)):
+            try:
+                with Image.open(os.path.join(BACKGROUNDS_DIR, file_name)) as source:
+                    source.load()
+                    return file_name, source.copy()
+            except Exception:
+                continue
+    return "default gradient", create_default_background()
+
+
+def measure(function, source, size, iterations):
+    """Time one call per iteration; count the frames allocated by a single call"""
+    with FrameCounter() as counter:
+        function(source, size)
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        function(source, size)
+    per_frame = (time.perf_counter() - start_time) / iterations
+
+    return {"ms_per_frame": round(per_frame * 1000, 3), "frames": counter.frames, "bytes": counter.bytes}
+
+
+def run(iterations: int = 50, size: str = "square"):
+    """Benchmark both pre-processing paths on the first available background"""
+    size = parse_size(size)
+    name, source = load_source()
+    return {
+        "source": name,
+        "size": f"{size[0]}x{size[1]}",
+        "legacy": measure(legacy_prepare_background, source, size, iterations),
+        "fused": measure(prepare_background, source, size, iterations),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark background pre-processing")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--size", default="square", help="Output size name or WIDTHxHEIGHT")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.size)
+    print(f"Source: {results['source']}, output {results['size']}, {args.iterations} iterations")
+    for label in ("legacy", "fused"):
+        result = results[label]
+        print(f"{label:>7}: {result['ms_per_frame']:7.2f} ms/frame, "
+              f"{result['frames']} frames allocated ({result['bytes'] / 1024 / 1024:.1f} MiB)")
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
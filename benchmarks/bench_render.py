@@ -0,0 +1,143 @@
+"""
+Render Pipeline Benchmark
+Times create_quote_image stage by stage, and text_wrap on its own
+
+Usage:
+    python benchmarks/bench_render.py [--iterations 10] [--size square]
+"""
+import argparse
+import json
+import os
+from typing import Any, Dict, Optional, Sequence
+
+from common import QUOTES, peak_rss_kb, summarize, timed
+
+from PIL import Image
+from image_creator import (
+    BACKGROUNDS_DIR, OUTPUT_FORMATS, THEME_BACKGROUNDS, create_default_background,
+    create_quote_image, draw_quote, encode_image, get_font, layout_quote, load_font,
+    parse_size, prepare_background, text_wrap
+)
+
+# Stages reported for every (theme, format, quote length) case
+STAGES = ("background_load", "blur_darken", "layout", "text_draw", "encode", "total")
+
+
+def pick_background(theme: str) -> Optional[str]:
+    """First existing background for a theme, so every run renders the same image"""
+    for file_name in THEME_BACKGROUNDS.get(theme, []):
+        path = os.path.join(BACKGROUNDS_DIR, file_name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_background(path: Optional[str], size) -> Image.Image:
+    """Decode a background file (or build the default gradient) without caching"""
+    if path is None:
+        return create_default_background(size)
+    with Image.open(path) as source:
+        source.load()
+        return source.copy()
+
+
+def bench_stages(
+    iterations: int,
+    size=(1080, 1080),
+    themes: Sequence[str] = tuple(THEME_BACKGROUNDS),
+    formats: Sequence[str] = tuple(OUTPUT_FORMATS),
+    lengths: Sequence[str] = tuple(QUOTES),
+) -> Dict[str, Any]:
+    """
+    Time each render stage for every theme, output format and quote length
+
+    Stages run cold (no background cache) except "total", which is a full
+    create_quote_image call with warm caches, as in a long-running worker.
+
+    Returns:
+        {"<theme>/<format>/<length>": {"chars", "bytes", <stage>: stats}}
+    """
+    results = {}
+    for theme in themes:
+        background_path = pick_background(theme)
+        for output_format in formats:
+            for length in lengths:
+                quote_text = QUOTES[length]
+                samples = {}
+                image_bytes = 0
+
+                for _ in range(iterations):
+                    with timed(samples, "background_load"):
+                        source = load_background(background_path, size)
+                    with timed(samples, "blur_darken"):
+                        img = prepare_background(source, size)
+                    with timed(samples, "layout"):
+                        layout = layout_quote(quote_text, "Benchmark Author", size)
+                    with timed(samples, "text_draw"):
+                        draw_quote(img, layout, theme)
+                    with timed(samples, "encode"):
+                        encoded = encode_image(img, output_format)
+                    image_bytes = encoded.buffer.getbuffer().nbytes
+
+                    with timed(samples, "total"):
+                        create_quote_image(
+                            quote_text, "Benchmark Author", theme,
+                            background_path=background_path, output_format=output_format,
+                            sizes=[size],
+                        )
+
+                case = {"chars": len(quote_text), "bytes": image_bytes}
+                case.update((stage, summarize(samples[stage])) for stage in STAGES)
+                results[f"{theme}/{output_format}/{length}"] = case
+
+    return results
+
+
+def bench_text_wrap(iterations: int, max_width: int = 880) -> Dict[str, Any]:
+    """
+    Time text_wrap for each quote length
+
+    "cold" uses a freshly loaded font, so every word is measured; "warm"
+    reuses the cached font and its word widths.
+    """
+    results = {}
+    for length, quote_text in QUOTES.items():
+        samples = {}
+        for _ in range(iterations):
+            cold_font = load_font("primary", 60)
+            with timed(samples, "cold"):
+                text_wrap(quote_text, cold_font, max_width)
+            with timed(samples, "warm"):
+                text_wrap(quote_text, get_font("primary", 60), max_width)
+
+        results[length] = {
+            "chars": len(quote_text),
+            "cold": summarize(samples["cold"]),
+            "warm": summarize(samples["warm"]),
+        }
+    return results
+
+
+def run(iterations: int = 10, size: str = "square") -> Dict[str, Any]:
+    """Run the render benchmarks"""
+    return {
+        "size": "x".join(str(dimension) for dimension in parse_size(size)),
+        "stages": bench_stages(iterations, parse_size(size)),
+        "text_wrap": bench_text_wrap(iterations * 10),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the render pipeline stage by stage")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--size", default="square", help="Output size name or WIDTHxHEIGHT")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.size)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
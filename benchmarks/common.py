@@ -0,0 +1,65 @@
+"""
+Benchmark Helpers
+Shared timing, statistics and memory helpers for the benchmark scripts
+"""
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'backend')
+
+# The backend modules import each other by bare name
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Sample quotes of increasing length
+QUOTES = {
+    "short": "Act, don't react.",
+    "medium": "The best way to predict the future is to create it, one small step at a time.",
+    "long": (
+        "Success is not final, failure is not fatal: it is the courage to continue that counts. "
+        "Keep going when it is hard, because the hard days are the ones that shape you, and the "
+        "habits you build on them carry you further than motivation ever will."
+    ),
+}
+
+
+@contextmanager
+def timed(samples: Dict[str, List[float]], stage: str):
+    """Append the duration of the with-block, in seconds, to samples[stage]"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.setdefault(stage, []).append(time.perf_counter() - start_time)
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Summary statistics of a list of durations in seconds, reported in milliseconds"""
+    ordered = sorted(durations)
+    p95_index = min(len(ordered) - 1, max(0, round(0.95 * len(ordered)) - 1))
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+    }
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
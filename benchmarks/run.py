@@ -0,0 +1,127 @@
+"""
+Benchmark Runner
+Runs every benchmark, writes the results to JSON and compares them with a baseline
+
+Usage:
+    python benchmarks/run.py [--quick] [--output results.json] [--compare baseline.json]
+
+Exits with status 1 when --compare finds a timing regression.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from common import ROOT_DIR, peak_rss_kb
+
+import PIL
+import bench_api
+import bench_background
+import bench_render
+
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+# Timing keys compared between runs (medians, being less noisy than means and tails)
+COMPARED_KEYS = ("median_ms", "ms_per_frame")
+DEFAULT_THRESHOLD = 0.10  # Flag timings more than 10% slower than the baseline
+MIN_DELTA_MS = 1.0        # ...and at least this much slower, to ignore jitter on tiny stages
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, if the tree is a git checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(quick: bool = False) -> Dict[str, Any]:
+    """Run every benchmark; quick runs use fewer iterations and requests"""
+    iterations = 2 if quick else 10
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+        },
+        "background": bench_background.run(iterations * 2),
+        "render": bench_render.run(iterations),
+        "api": bench_api.run(requests=40 if quick else 200),
+    }
+    results["peak_rss_kb"] = peak_rss_kb()
+    return results
+
+
+def flatten_timings(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Collect every compared timing as {"path/to/key": value}"""
+    timings = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            timings.update(flatten_timings(value, path))
+        elif key in COMPARED_KEYS and isinstance(value, (int, float)):
+            timings[path] = value
+    return timings
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Find timings that got slower than the baseline by more than threshold
+
+    Returns:
+        One line per regression
+    """
+    before = flatten_timings(baseline)
+    after = flatten_timings(current)
+    regressions = []
+    for path in sorted(before.keys() & after.keys()):
+        if (after[path] > before[path] * (1 + threshold)
+                and after[path] - before[path] >= MIN_DELTA_MS):
+            change = (after[path] / before[path] - 1) * 100 if before[path] else float("inf")
+            regressions.append(f"{path}: {before[path]:.3f} -> {after[path]:.3f} ms (+{change:.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the AutoQuoter benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a fast sanity check")
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.quick)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output} (peak RSS {results['peak_rss_kb']} KiB)")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} timings regressed by more than {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
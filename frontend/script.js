@@ -214,6 +214,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 
                 // Store blob for download
                 preview.dataset.blob = imageUrl;
+                preview.dataset.extension = imageBlob.type === 'image/jpeg' ? 'jpg' : (imageBlob.type.split('/')[1] || 'png');
                 
                 // Update and show quote text container
                 updateQuoteTextDisplay();
@@ -273,7 +274,7 @@ document.addEventListener('DOMContentLoaded', function() {
         if (preview.src) {
             const a = document.createElement('a');
             a.href = preview.dataset.blob;
-            a.download = `autoquoter-${new Date().getTime()}.png`;
+            a.download = `autoquoter-${new Date().getTime()}.${preview.dataset.extension || 'png'}`;
             document.body.appendChild(a);
             a.click();
             document.body.removeChild(a);
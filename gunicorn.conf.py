@@ -0,0 +1,47 @@
+"""
+Gunicorn Configuration
+Production serving for AutoQuoter:
+    gunicorn --config gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+
+# Make the flat backend modules importable
+pythonpath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Rendering is CPU-bound: one worker process per core, with a few threads
+# each to overlap quota, cache and network I/O
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# The app shares the host's cores for batch rendering between the workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Load fonts, backgrounds and the quote corpus once in the master and
+# share them with the workers copy-on-write
+preload_app = True
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to cap memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Start the background threads, which do not survive fork, in each worker"""
+    import main
+    main.start_background_tasks()
+
+
+def post_worker_init(worker):
+    """Render one image per theme before the worker starts accepting requests"""
+    import main
+    main.warm_up()
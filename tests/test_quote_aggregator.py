@@ -0,0 +1,120 @@
+"""
+Quote Aggregator Tests
+Races fake quote sources with injected delays
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from quote_aggregator import DEFAULT_HEDGE_DELAY_SECONDS, QuoteAggregator  # noqa: E402
+
+
+def fake_source(name, delay, calls=None):
+    """A source that answers after `delay` seconds, optionally logging each call"""
+    def source(theme):
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        return {"text": f"Quote from {name}", "author": name}
+    return source
+
+
+@pytest.fixture
+def make_aggregator():
+    aggregators = []
+
+    def make(delays, deadline_seconds=0.8, calls=None):
+        aggregator = QuoteAggregator(
+            {name: fake_source(name, delay, calls) for name, delay in delays.items()},
+            deadline_seconds=deadline_seconds,
+        )
+        aggregators.append(aggregator)
+        return aggregator
+
+    yield make
+    for aggregator in aggregators:
+        aggregator.close()
+
+
+def timed_fetch(aggregator, source_names):
+    start_time = time.perf_counter()
+    quote = aggregator.fetch("wisdom", source_names)
+    return quote, time.perf_counter() - start_time
+
+
+def test_first_source_wins_without_hedging(make_aggregator):
+    calls = []
+    aggregator = make_aggregator({"a": 0.05, "b": 0.05}, calls=calls)
+
+    quote, elapsed = timed_fetch(aggregator, ["a", "b"])
+    assert quote["author"] == "a"
+    assert elapsed < DEFAULT_HEDGE_DELAY_SECONDS
+    assert calls == ["a"]
+
+
+def test_hedge_starts_next_source(make_aggregator):
+    aggregator = make_aggregator({"a": 1.0, "b": 0.1})
+
+    quote, elapsed = timed_fetch(aggregator, ["a", "b"])
+    assert quote["author"] == "b"
+    assert DEFAULT_HEDGE_DELAY_SECONDS <= elapsed < 0.7
+
+
+def test_deadline_returns_none(make_aggregator):
+    aggregator = make_aggregator({"a": 1.0, "b": 1.0}, deadline_seconds=0.4)
+
+    quote, elapsed = timed_fetch(aggregator, ["a", "b"])
+    assert quote is None
+    assert elapsed < 0.6
+
+
+def test_concurrent_fetches_still_hedge(make_aggregator):
+    aggregator = make_aggregator({"a": 1.0, "b": 0.1})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: timed_fetch(aggregator, ["a", "b"]), range(8)))
+
+    for quote, elapsed in results:
+        assert quote is not None and quote["author"] == "b"
+        assert elapsed < 0.7
+
+
+def test_source_with_abandoned_call_is_skipped(make_aggregator):
+    calls = []
+    aggregator = make_aggregator({"a": 1.0, "b": 0.1}, calls=calls)
+
+    quote, _ = timed_fetch(aggregator, ["a", "b"])
+    assert quote["author"] == "b"
+    assert aggregator.get_stats()["sources"]["a"]["abandonedCalls"] == 1
+
+    # The first call to a is still running, so the next race goes straight to b
+    quote, elapsed = timed_fetch(aggregator, ["a", "b"])
+    assert quote["author"] == "b"
+    assert elapsed < DEFAULT_HEDGE_DELAY_SECONDS
+    assert calls == ["a", "b", "b"]
+
+
+def test_fetches_beyond_limit_give_up_at_once(make_aggregator):
+    release = threading.Event()
+    aggregator = QuoteAggregator(
+        {"slow": lambda theme: release.wait(2) and None},
+        deadline_seconds=1.0,
+        max_concurrent_fetches=1,
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(aggregator.fetch, "wisdom", ["slow"])
+            time.sleep(0.1)
+            quote, elapsed = timed_fetch(aggregator, ["slow"])
+            release.set()
+            pending.result()
+        assert quote is None
+        assert elapsed < 0.1
+    finally:
+        aggregator.close()
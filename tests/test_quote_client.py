@@ -0,0 +1,113 @@
+"""
+Quote Source Client Tests
+Exercises retries, the circuit breaker and the counters against a local stub HTTP server
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from quote_client import DEFAULT_FAILURE_THRESHOLD, QuoteSourceClient  # noqa: E402
+
+COOLDOWN_SECONDS = 0.2
+QUOTE = [{"q": "Stay hungry, stay foolish.", "a": "Steve Jobs"}]
+
+
+class StubServer:
+    """Answers GETs with scripted status codes, then 200 once the script runs out"""
+
+    def __init__(self):
+        self.script = []
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                status = stub.script.pop(0) if stub.script else 200
+                body = json.dumps(QUOTE if status == 200 else {"error": "stub"}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/quote"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client():
+    client = QuoteSourceClient(timeout=(1, 1), backoff_factor=0, cooldown_seconds=COOLDOWN_SECONDS)
+    client.session.trust_env = False  # Never route the stub through a proxy
+    yield client
+    client.session.close()
+
+
+def test_server_errors_are_retried(stub, client):
+    stub.script = [500, 500]
+
+    assert client.get_json("stub", stub.url) == QUOTE
+    assert stub.hits == 3
+
+    stats = client.get_stats()["stub"]
+    assert (stats["requests"], stats["errors"], stats["rejected"]) == (1, 0, 0)
+    assert stats["circuit"] == "closed"
+
+
+def test_breaker_opens_after_consecutive_failures(stub, client):
+    stub.script = [500] * (3 * DEFAULT_FAILURE_THRESHOLD)
+
+    for _ in range(DEFAULT_FAILURE_THRESHOLD):
+        assert client.get_json("stub", stub.url) is None
+    assert client.get_stats()["stub"]["circuit"] == "open"
+
+    # Rejected without reaching the server
+    hits = stub.hits
+    assert client.get_json("stub", stub.url) is None
+    assert stub.hits == hits
+
+    stats = client.get_stats()["stub"]
+    assert (stats["requests"], stats["errors"], stats["rejected"]) == (DEFAULT_FAILURE_THRESHOLD, DEFAULT_FAILURE_THRESHOLD, 1)
+
+
+def test_half_open_allows_one_trial(stub, client):
+    breaker = client.get_breaker("stub")
+    for _ in range(DEFAULT_FAILURE_THRESHOLD):
+        breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(COOLDOWN_SECONDS)
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # The trial's outcome settles the breaker: a failure reopens it...
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    # ...and a success through the client closes it
+    time.sleep(COOLDOWN_SECONDS)
+    assert client.get_json("stub", stub.url) == QUOTE
+    assert client.get_stats()["stub"]["circuit"] == "closed"
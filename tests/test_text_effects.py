@@ -0,0 +1,109 @@
+"""
+Text Effect Regression Tests
+Compares draw_text_with_effect against the four-offset drawing it replaced
+"""
+import os
+import sys
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageStat
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import image_creator  # noqa: E402
+from image_creator import SHADOW_FILL, TEXT_FILL, create_default_background, draw_text_with_effect  # noqa: E402
+
+CANVAS_SIZE = (800, 400)
+
+
+def load_test_font(size):
+    """A FreeType font: Pillow's bundled one (10.1+) or one of the app fonts"""
+    try:
+        font = ImageFont.load_default(size=size)
+        if isinstance(font, ImageFont.FreeTypeFont):
+            return font
+    except TypeError:
+        pass
+
+    for font_file in image_creator.FONTS.values():
+        try:
+            return ImageFont.truetype(os.path.join(image_creator.FONTS_DIR, font_file), size)
+        except OSError:
+            continue
+    pytest.skip("No FreeType font available")
+
+
+@pytest.fixture(scope="module")
+def text_runs():
+    quote_font = load_test_font(48)
+    author_font = load_test_font(30)
+    return [
+        ((100, 120), "Quality is not an act,", quote_font),
+        ((90, 200), "it is a habit.", quote_font),
+        ((300, 300), "— Aristotle", author_font),
+    ]
+
+
+def legacy_draw(img, text_runs):
+    """The renderer before draw_text_with_effect: four offset draws, then the text"""
+    draw = ImageDraw.Draw(img)
+    for (x, y), text, font in text_runs:
+        for offset in [(1, 1), (-1, -1), (1, -1), (-1, 1)]:
+            draw.text((x + offset[0], y + offset[1]), text, font=font, fill=(0, 0, 0, 180))
+        draw.text((x, y), text, font=font, fill=(255, 255, 255))
+    return img
+
+
+def render(effect, text_runs, cached_runs=()):
+    img = create_default_background(CANVAS_SIZE)
+    draw_text_with_effect(img, text_runs, effect, cached_runs)
+    return img
+
+
+def mean_difference(a, b):
+    return max(ImageStat.Stat(ImageChops.difference(a, b)).mean)
+
+
+def test_offset_matches_legacy(text_runs):
+    legacy = legacy_draw(create_default_background(CANVAS_SIZE), text_runs)
+    assert ImageChops.difference(legacy, render("offset", text_runs)).getbbox() is None
+
+
+def test_cached_runs_match_uncached(text_runs):
+    for effect in ("offset", "stroke", "shadow"):
+        cached = render(effect, text_runs[:2], cached_runs=text_runs[2:])
+        assert ImageChops.difference(render(effect, text_runs), cached).getbbox() is None, effect
+
+
+def test_stroke_matches_freetype_stroke(text_runs):
+    expected = create_default_background(CANVAS_SIZE)
+    draw = ImageDraw.Draw(expected)
+    for xy, text, font in text_runs:
+        draw.text(xy, text, font=font, fill=TEXT_FILL, stroke_width=1, stroke_fill=SHADOW_FILL)
+
+    assert ImageChops.difference(expected, render("stroke", text_runs)).getbbox() is None
+
+
+def test_stroke_close_to_legacy(text_runs):
+    legacy = legacy_draw(create_default_background(CANVAS_SIZE), text_runs)
+    assert mean_difference(legacy, render("stroke", text_runs)) < 0.5
+
+
+def test_shadow_close_to_legacy(text_runs):
+    legacy = legacy_draw(create_default_background(CANVAS_SIZE), text_runs)
+    shadow = render("shadow", text_runs)
+    assert mean_difference(legacy, shadow) < 2.5
+
+    # The text itself is drawn the same way; only the shadow under it differs
+    text_mask = Image.new('L', CANVAS_SIZE, 0)
+    draw = ImageDraw.Draw(text_mask)
+    for xy, text, font in text_runs:
+        draw.text(xy, text, font=font, fill=255)
+    fully_covered = text_mask.point(lambda value: 255 if value == 255 else 0)
+    text_difference = ImageChops.difference(legacy, shadow)
+    assert ImageChops.multiply(text_difference.convert('L'), fully_covered).getbbox() is None
+
+
+def test_unknown_effect_rejected(text_runs):
+    with pytest.raises(ValueError):
+        render("glow", text_runs)